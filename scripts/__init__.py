@@ -16,6 +16,13 @@ from .protocol_pl import (
     DEFAULT_CONFIG
 )
 
+from .compute_backend import (
+    set_backend,
+    get_backend,
+    check_backend_parity,
+    BACKENDS
+)
+
 from .historic_data import (
     display_historic_pl,
     display_rewards_trends,
@@ -23,6 +30,27 @@ from .historic_data import (
     display_all_historic,
     calculate_monthly_pl,
     calculate_rewards_by_month,
+    calculate_rewards_by_network,
     calculate_tvl_trends
 )
 
+
+from .entity_registry import (
+    encode_datasets,
+    build_registry,
+    EntityRegistry,
+    EncodedDatasets,
+    JoinIndex
+)
+
+from .chart_series import (
+    ChartSeries,
+    lttb,
+    downsample
+)
+
+from .fee_schedule import (
+    DatedSchedule,
+    calculate_daily_pl,
+    backfill_fee_scenarios
+)
@@ -0,0 +1,246 @@
+"""
+Symbiotic Chart Series
+======================
+Chart-ready daily TVL, per-collateral TVL and cumulative rewards, downsampled
+with Largest-Triangle-Three-Buckets (LTTB) so full histories render fast while
+keeping peaks and drawdowns. Results are kept in a small LRU per (data version,
+series, range, resolution).
+
+Usage in Hex:
+    from scripts.chart_series import ChartSeries
+    charts = ChartSeries(data)                    # data = load_all_data()
+    charts.get('tvl', points=500)
+    charts.get('tvl_by_collateral', points=300, start='2025-06-01')
+    charts.get('rewards_cumsum', points=200)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ═══════════════════════════════════════════════════════════════
+# LTTB
+# ═══════════════════════════════════════════════════════════════
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Only the bucket walk is sequential (each pick depends on the previous one);
+    bucket averages and triangle areas are computed with numpy.
+
+    Args:
+        x: Monotonic x values (e.g. int64 timestamps)
+        y: y values
+        n_out: Target number of points
+
+    Returns:
+        numpy array of selected row positions (sorted, first and last kept)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    # n_out - 2 buckets over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average of the *next* bucket for every bucket at once (the last bucket's
+    # next "bucket" is the final point)
+    next_starts = ends
+    next_ends = np.append(edges[2:], n)
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    width = next_ends - next_starts
+    avg_x = (cx[next_ends] - cx[next_starts]) / width
+    avg_y = (cy[next_ends] - cy[next_starts]) / width
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = starts[i], ends[i]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i]) * (y[s:e] - ay) - (ax - x[s:e]) * (avg_y[i] - ay))
+        a = s + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def downsample(df, x_col, y_col, points):
+    """
+    LTTB-downsample a DataFrame on (x_col, y_col); rows with NaN y are dropped.
+    """
+    df = df.dropna(subset=[y_col]).sort_values(x_col, kind='mergesort')
+    x = df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x = x.astype('int64')
+    keep = lttb(x.to_numpy(), df[y_col].to_numpy(), points)
+    return df.iloc[keep].reset_index(drop=True)
+
+
+# ═══════════════════════════════════════════════════════════════
+# SERIES
+# ═══════════════════════════════════════════════════════════════
+
+def daily_tvl(df_tvl, time_col='dt', tvl_col='TVL_usd'):
+    """Total TVL per day across all collaterals -> ['Date', 'TVL']."""
+    df = pd.DataFrame({'Date': pd.to_datetime(df_tvl[time_col]).dt.normalize(),
+                       'TVL': df_tvl[tvl_col]})
+    return df.groupby('Date', as_index=False)['TVL'].sum()
+
+
+def daily_tvl_by_collateral(df_tvl, time_col='dt', tvl_col='TVL_usd', key_col='symbol'):
+    """TVL per day per collateral -> ['Date', 'Collateral', 'TVL']."""
+    df = pd.DataFrame({'Date': pd.to_datetime(df_tvl[time_col]).dt.normalize(),
+                       'Collateral': df_tvl[key_col],
+                       'TVL': df_tvl[tvl_col]})
+    return df.groupby(['Collateral', 'Date'], as_index=False)['TVL'].sum()
+
+
+def daily_rewards_cumsum(df_rewards, time_col='dt', cumsum_col='rewards_cumsum'):
+    """Cumulative rewards at end of each day -> ['Date', 'Cumulative Rewards']."""
+    df = pd.DataFrame({'Date': pd.to_datetime(df_rewards[time_col]).dt.normalize(),
+                       'Cumulative Rewards': df_rewards[cumsum_col]})
+    return df.groupby('Date', as_index=False)['Cumulative Rewards'].max()
+
+
+def data_fingerprint(*frames):
+    """Content hash of DataFrames, used as the dataset version."""
+    h = hashlib.sha1()
+    for df in frames:
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def _to_date(value):
+    """
+    Parse a range bound to a naive (UTC) midnight Timestamp; None / '' -> None.
+
+    Raises:
+        ValueError: for anything that isn't a date
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"❌ Invalid date {value!r}") from e
+    if pd.isna(ts):
+        raise ValueError(f"❌ Invalid date {value!r}")
+    if ts.tz is not None:
+        ts = ts.tz_convert(None)
+    return ts.normalize()
+
+
+class LRUCache:
+    """Small thread-safe LRU mapping (maxsize <= 0 disables caching)."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ChartSeries:
+    """
+    Downsampled chart series over one version of the data.
+
+    The full daily series are built once; get() results are kept in a bounded
+    LRU keyed on (version, series, points, start, end), with start / end
+    normalized to dates so equivalent ranges share one entry.
+    """
+
+    SERIES = ('tvl', 'tvl_by_collateral', 'rewards_cumsum')
+
+    def __init__(self, data, version=None, cache_size=64):
+        """
+        Args:
+            data: dict of DataFrames with 'tvl_over_time' and 'rewards_total'
+            version: Optional data version (content hash if None)
+            cache_size: Max cached results (0 to disable, e.g. when the caller caches)
+        """
+        tvl = data['tvl_over_time']
+        rewards = data['rewards_total']
+        self.version = version or data_fingerprint(tvl, rewards)
+        self._full = {
+            'tvl': daily_tvl(tvl),
+            'tvl_by_collateral': daily_tvl_by_collateral(tvl),
+            'rewards_cumsum': daily_rewards_cumsum(rewards),
+        }
+        self._cache = LRUCache(cache_size)
+
+    def normalize(self, series, points=500, start=None, end=None):
+        """
+        Validate a request and normalize start / end to dates (the series are daily).
+        Empty bounds mean open-ended; tz-aware bounds are converted to UTC.
+
+        Returns:
+            tuple (series, points, start, end)
+
+        Raises:
+            ValueError: for an unknown series or an unparseable date
+        """
+        if series not in self._full:
+            raise ValueError(f"❌ Unknown series '{series}'. Choose from: {list(self.SERIES)}")
+        return series, int(points), _to_date(start), _to_date(end)
+
+    def get(self, series, points=500, start=None, end=None):
+        """
+        Downsampled series for [start, end] with at most `points` points
+        (per collateral for 'tvl_by_collateral').
+
+        Returns:
+            DataFrame (cached - do not modify in place)
+        """
+        series, points, start, end = self.normalize(series, points, start, end)
+        key = (self.version, series, points, start, end)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._build(series, points, start, end)
+            self._cache.put(key, result)
+        return result
+
+    def _build(self, series, points, start, end):
+        df = self._full[series]
+        if start is not None:
+            df = df[df['Date'] >= start]
+        if end is not None:
+            df = df[df['Date'] <= end]
+        y_col = df.columns[-1]
+        if series == 'tvl_by_collateral':
+            parts = [downsample(g, 'Date', y_col, points) for _, g in df.groupby('Collateral', sort=True)]
+            return pd.concat(parts, ignore_index=True) if parts else df.iloc[0:0]
+        return downsample(df, 'Date', y_col, points)
+
+
+# Print available functions
+print("📊 Chart Series loaded!")
+print("   → ChartSeries(data).get('tvl' | 'tvl_by_collateral' | 'rewards_cumsum', points)")
+print("   → lttb(x, y, n_out)")
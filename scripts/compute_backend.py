@@ -0,0 +1,341 @@
+"""
+Symbiotic Compute Backends
+==========================
+Run the historic / P&L aggregations either in pandas or as SQL in an
+embedded DuckDB (multi-threaded, reads the data/ CSV or Parquet files directly).
+
+Usage in Hex:
+    from scripts.compute_backend import set_backend, check_backend_parity
+    set_backend('duckdb')                                   # all calculations
+    calculate_monthly_pl('data/rewards_total.csv', backend='duckdb')   # one call
+"""
+
+import os
+import pandas as pd
+
+# ═══════════════════════════════════════════════════════════════
+# BACKEND SELECTION
+# ═══════════════════════════════════════════════════════════════
+
+BACKENDS = ('pandas', 'duckdb')
+
+# Default backend - override with SYMBIOTIC_BACKEND=duckdb or set_backend()
+_default_backend = os.environ.get('SYMBIOTIC_BACKEND', 'pandas')
+
+_duckdb_con = None
+
+
+def set_backend(name):
+    """
+    Set the default compute backend ('pandas' or 'duckdb').
+    """
+    global _default_backend
+    _default_backend = resolve_backend(name)
+    return _default_backend
+
+
+def get_backend():
+    """
+    Return the current default compute backend.
+    """
+    return _default_backend
+
+
+def resolve_backend(backend=None):
+    """
+    Resolve a backend name (None -> current default) and validate it.
+    """
+    name = (backend or _default_backend).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"❌ Unknown backend '{backend}'. Choose from: {list(BACKENDS)}")
+    return name
+
+
+def read_source(source):
+    """
+    Return a DataFrame for a DataFrame or a CSV/Parquet file path.
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    path = str(source)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def source_columns(source):
+    """
+    Column names of a DataFrame or CSV/Parquet file (without loading the file into pandas).
+    """
+    if isinstance(source, pd.DataFrame):
+        return list(source.columns)
+    _, columns = _open(source)
+    return list(columns)
+
+
+# ═══════════════════════════════════════════════════════════════
+# DUCKDB HELPERS
+# ═══════════════════════════════════════════════════════════════
+
+def _connection():
+    """
+    Lazily create the shared in-memory DuckDB connection.
+    """
+    global _duckdb_con
+    if _duckdb_con is None:
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("❌ duckdb required for backend='duckdb'. Install with: pip install duckdb")
+        _duckdb_con = duckdb.connect(database=':memory:')
+    # One cursor per call so concurrent callers don't share registered views
+    return _duckdb_con.cursor()
+
+
+def _q(name):
+    """Quote a SQL identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _open(source):
+    """
+    Open a cursor with `source` exposed as the view `src`.
+
+    Returns:
+        tuple (cursor, {column_name: duckdb_type})
+    """
+    con = _connection()
+    if isinstance(source, pd.DataFrame):
+        con.register('src', source)
+    else:
+        path = str(source).replace("'", "''")
+        reader = 'read_parquet' if path.endswith('.parquet') else 'read_csv_auto'
+        con.execute(f"CREATE OR REPLACE TEMP VIEW src AS SELECT * FROM {reader}('{path}')")
+    schema = con.execute("DESCRIBE src").fetchall()
+    return con, {row[0]: row[1] for row in schema}
+
+
+def _detect_amount_col(columns, candidates, numeric_fallback=True):
+    """
+    Mirror the pandas amount auto-detection against a DuckDB schema.
+    """
+    for col in candidates:
+        if col in columns:
+            return col
+    if numeric_fallback:
+        for col, dtype in columns.items():
+            if dtype in ('DOUBLE', 'BIGINT'):
+                return col
+    return None
+
+
+def _first_present(columns, preferred, candidates):
+    if preferred in columns:
+        return preferred
+    for col in candidates:
+        if col in columns:
+            return col
+    return preferred
+
+
+def _ts(col):
+    """SQL expression casting a column to TIMESTAMP."""
+    return f"TRY_CAST({_q(col)} AS TIMESTAMP)"
+
+
+# ═══════════════════════════════════════════════════════════════
+# DUCKDB AGGREGATIONS
+# ═══════════════════════════════════════════════════════════════
+# Each returns the same raw aggregate the pandas groupby produces; the
+# derived columns (margins, growth, % of total) are shared in pandas.
+
+AMOUNT_CANDIDATES = ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']
+
+
+def duckdb_total(source, amount_col=None):
+    """
+    Sum of the amount column (used by calculate_pl).
+
+    Returns:
+        tuple (total, amount_col)
+    """
+    con, columns = _open(source)
+    if amount_col is None:
+        amount_col = _detect_amount_col(columns, AMOUNT_CANDIDATES)
+    if amount_col is None:
+        raise ValueError("Could not find amount column in data")
+    total = con.execute(f"SELECT COALESCE(SUM({_q(amount_col)}), 0) FROM src").fetchone()[0]
+    return total, amount_col
+
+
+def duckdb_monthly_totals(source, time_col='time', amount_col=None):
+    """
+    Monthly sum of rewards -> DataFrame ['Month', 'Gross Rewards'].
+    """
+    con, columns = _open(source)
+    if amount_col is None:
+        amount_col = _detect_amount_col(columns, AMOUNT_CANDIDATES)
+    sql = f"""
+        SELECT strftime({_ts(time_col)}, '%Y-%m') AS "Month",
+               COALESCE(SUM({_q(amount_col)}), 0) AS "Gross Rewards"
+        FROM src
+        WHERE {_ts(time_col)} IS NOT NULL
+        GROUP BY 1
+        ORDER BY 1
+    """
+    return con.execute(sql).fetchdf()
+
+
+def duckdb_monthly_stats(source, time_col='time', amount_col=None):
+    """
+    Monthly sum / count / mean -> DataFrame ['Month', 'Total Rewards', 'Transactions', 'Avg Reward'].
+    """
+    con, columns = _open(source)
+    if amount_col is None:
+        amount_col = _detect_amount_col(columns, AMOUNT_CANDIDATES, numeric_fallback=False)
+    amt = _q(amount_col)
+    sql = f"""
+        SELECT strftime({_ts(time_col)}, '%Y-%m') AS "Month",
+               COALESCE(SUM({amt}), 0) AS "Total Rewards",
+               COUNT({amt}) AS "Transactions",
+               AVG({amt}) AS "Avg Reward"
+        FROM src
+        WHERE {_ts(time_col)} IS NOT NULL
+        GROUP BY 1
+        ORDER BY 1
+    """
+    monthly = con.execute(sql).fetchdf()
+    monthly['Transactions'] = monthly['Transactions'].astype('int64')
+    return monthly
+
+
+def duckdb_network_totals(source, network_col='network', amount_col=None):
+    """
+    Sum of rewards per network -> DataFrame ['Network', 'Total Rewards'] (None if no network column).
+    """
+    con, columns = _open(source)
+    if amount_col is None:
+        amount_col = _detect_amount_col(columns, AMOUNT_CANDIDATES[:-1], numeric_fallback=False)
+    network_col = _first_present(columns, network_col, ['network', 'vault', 'vault_name', 'protocol'])
+    if network_col not in columns:
+        return None
+    sql = f"""
+        SELECT {_q(network_col)} AS "Network",
+               COALESCE(SUM({_q(amount_col)}), 0) AS "Total Rewards"
+        FROM src
+        WHERE {_q(network_col)} IS NOT NULL
+        GROUP BY 1
+        ORDER BY 1
+    """
+    return con.execute(sql).fetchdf()
+
+
+def duckdb_daily_totals(source, time_col='time', amount_col=None, key_col=None):
+    """
+    Daily sum of rewards (per key if key_col) -> DataFrame ['Date', ('Key',) 'Gross Rewards'].
+    """
+    con, columns = _open(source)
+    if amount_col is None:
+        amount_col = _detect_amount_col(columns, AMOUNT_CANDIDATES)
+    key = f', {_q(key_col)} AS "Key"' if key_col is not None else ''
+    group = '1, 2' if key_col is not None else '1'
+    sql = f"""
+        SELECT CAST({_ts(time_col)} AS DATE) AS "Date"{key},
+               COALESCE(SUM({_q(amount_col)}), 0) AS "Gross Rewards"
+        FROM src
+        WHERE {_ts(time_col)} IS NOT NULL
+        GROUP BY {group}
+        ORDER BY {group}
+    """
+    daily = con.execute(sql).fetchdf()
+    if key_col is not None:
+        daily['Key'] = daily['Key'].astype(object).where(daily['Key'].notna(), None)
+    return daily
+
+
+def duckdb_daily_tvl(source, time_col='time', tvl_col='tvl'):
+    """
+    End-of-day TVL (last non-null value by time, file order breaks ties)
+    -> DataFrame ['Date', 'TVL'].
+    """
+    con, columns = _open(source)
+    tvl_col = _first_present(columns, tvl_col, ['tvl', 'total_tvl', 'tvl_usd', 'value', 'amount'])
+    time_col = _first_present(columns, time_col, ['time', 'date', 'timestamp', 'block_time'])
+    sql = f"""
+        WITH ordered AS (
+            SELECT {_ts(time_col)} AS ts, {_q(tvl_col)} AS tvl, row_number() OVER () AS rn
+            FROM src
+        )
+        SELECT CAST(ts AS DATE) AS "Date",
+               arg_max(tvl, (ts, rn)) FILTER (WHERE tvl IS NOT NULL) AS "TVL"
+        FROM ordered
+        WHERE ts IS NOT NULL
+        GROUP BY 1
+        ORDER BY 1
+    """
+    daily = con.execute(sql).fetchdf()
+    daily['Date'] = pd.to_datetime(daily['Date']).dt.date
+    return daily
+
+
+# ═══════════════════════════════════════════════════════════════
+# PARITY CHECK
+# ═══════════════════════════════════════════════════════════════
+
+def check_backend_parity(df_rewards, df_tvl=None, df_rewards_network=None,
+                         time_col='time', network_col='network', tvl_col='tvl', rtol=1e-9):
+    """
+    Run every calculation on both backends and compare the results.
+
+    Args:
+        df_rewards: DataFrame or file path with rewards data
+        df_tvl: Optional DataFrame or file path with TVL data
+        df_rewards_network: Optional per-network rewards (defaults to df_rewards)
+        time_col: Timestamp column of the rewards / TVL data
+        network_col: Network column of the per-network rewards
+        tvl_col: TVL column of the TVL data
+        rtol: Relative tolerance for float columns
+
+    Returns:
+        DataFrame with one row per calculation: ['Calculation', 'Match', 'Detail']
+    """
+    from .historic_data import (
+        calculate_monthly_pl, calculate_rewards_by_month,
+        calculate_rewards_by_network, calculate_tvl_trends,
+    )
+    from .protocol_pl import calculate_pl
+
+    cases = [
+        ('calculate_monthly_pl', calculate_monthly_pl, df_rewards, {'time_col': time_col}),
+        ('calculate_rewards_by_month', calculate_rewards_by_month, df_rewards, {'time_col': time_col}),
+        ('calculate_rewards_by_network', calculate_rewards_by_network,
+         df_rewards_network if df_rewards_network is not None else df_rewards,
+         {'network_col': network_col}),
+        ('calculate_pl', calculate_pl, df_rewards, {}),
+    ]
+    if df_tvl is not None:
+        cases.append(('calculate_tvl_trends', calculate_tvl_trends, df_tvl,
+                      {'time_col': time_col, 'tvl_col': tvl_col}))
+
+    results = []
+    for name, func, source, kwargs in cases:
+        try:
+            expected = func(source, backend='pandas', **kwargs)
+            actual = func(source, backend='duckdb', **kwargs)
+            if isinstance(expected, dict):
+                expected, actual = pd.DataFrame([expected]), pd.DataFrame([actual])
+            pd.testing.assert_frame_equal(expected, actual, rtol=rtol, check_dtype=False)
+            results.append({'Calculation': name, 'Match': True, 'Detail': ''})
+        except AssertionError as e:
+            results.append({'Calculation': name, 'Match': False, 'Detail': str(e).splitlines()[0]})
+        except Exception as e:
+            # A backend failing outright is a mismatch too, not a reason to abort the report
+            results.append({'Calculation': name, 'Match': False, 'Detail': f'{type(e).__name__}: {e}'})
+
+    return pd.DataFrame(results)
+
+
+# Print available functions when imported
+print("📊 Compute Backends loaded!")
+print(f"   → set_backend(name)  ({'/'.join(BACKENDS)}, current: {_default_backend})")
+print("   → check_backend_parity(df_rewards, df_tvl)")
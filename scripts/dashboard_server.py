@@ -0,0 +1,283 @@
+"""
+Symbiotic Dashboard API Server
+==============================
+Serve the P&L, scenario, rewards and TVL calculations as JSON from a small
+aiohttp service. Results are computed once per data version (the mtimes of
+the data/ files), kept in memory, gzip'd up front and served with ETags, and
+recomputed in the background when a data file changes.
+
+Usage:
+    python -m scripts.dashboard_server --data-dir data --port 8080
+
+    curl -H 'Accept-Encoding: gzip' http://localhost:8080/api/monthly-pl
+    curl 'http://localhost:8080/api/chart/tvl?points=500&start=2025-06-01'
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+
+import pandas as pd
+from aiohttp import web
+
+from .protocol_pl import calculate_pl, scenario_analysis
+from .historic_data import calculate_monthly_pl, calculate_rewards_by_month, calculate_tvl_trends
+from .chart_series import ChartSeries, LRUCache, daily_tvl
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+# Dataset name -> file in data_dir
+DATASETS = {
+    'rewards': 'rewards_total.csv',
+    'tvl': 'tvl_over_time.csv',
+}
+
+# Upper bound for ?points= on chart endpoints
+MAX_CHART_POINTS = 5000
+
+# Serialized chart responses kept per data version (LRU)
+CHART_CACHE_SIZE = 128
+
+# Column names used by the exported Dune CSVs
+TIME_COL = 'dt'
+TVL_COL = 'TVL_usd'
+
+# Endpoint -> calculation over the loaded datasets
+ENDPOINTS = {
+    'pl': lambda d: calculate_pl(d['rewards']),
+    'scenarios': lambda d: scenario_analysis(d['rewards']),
+    'monthly-pl': lambda d: calculate_monthly_pl(d['rewards'], time_col=TIME_COL),
+    'rewards-by-month': lambda d: calculate_rewards_by_month(d['rewards'], time_col=TIME_COL),
+    # tvl_over_time has one row per collateral per day - sum to daily totals first
+    'tvl-trends': lambda d: calculate_tvl_trends(daily_tvl(d['tvl'], TIME_COL, TVL_COL),
+                                                 time_col='Date', tvl_col='TVL'),
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+# PRECOMPUTED RESPONSES
+# ═══════════════════════════════════════════════════════════════
+
+def data_version(data_dir, datasets=DATASETS):
+    """
+    Fingerprint of the data files (name, size, mtime) - changes whenever a file does.
+    """
+    h = hashlib.sha1()
+    for name, filename in sorted(datasets.items()):
+        path = os.path.join(data_dir, filename)
+        try:
+            st = os.stat(path)
+            h.update(f'{name}:{st.st_size}:{st.st_mtime_ns};'.encode())
+        except FileNotFoundError:
+            h.update(f'{name}:missing;'.encode())
+    return h.hexdigest()[:16]
+
+
+def _to_jsonable(result):
+    """Convert a DataFrame / metrics dict into plain JSON types."""
+    if isinstance(result, pd.DataFrame):
+        return json.loads(result.to_json(orient='records', date_format='iso'))
+    return {k: (v.item() if hasattr(v, 'item') else v) for k, v in result.items()}
+
+
+def _entry(version, key, result):
+    """Serialize a result once: JSON body, gzip'd body and ETag."""
+    body = json.dumps({'version': version, 'data': _to_jsonable(result)}).encode()
+    return {
+        'etag': f'"{version}-{key}"',
+        'body': body,
+        'gzip': gzip.compress(body, compresslevel=6),
+    }
+
+
+def build_responses(data_dir, datasets=DATASETS, endpoints=ENDPOINTS):
+    """
+    Load the datasets and run every calculation once.
+
+    Returns:
+        tuple (version, {endpoint: {'etag', 'body', 'gzip'}}, ChartSeries)
+    """
+    version = data_version(data_dir, datasets)
+    data = {name: pd.read_csv(os.path.join(data_dir, filename)) for name, filename in datasets.items()}
+
+    responses = {name: _entry(version, name, func(data)) for name, func in endpoints.items()}
+    # The server caches serialized chart responses itself, so no DataFrame cache here
+    charts = ChartSeries({'tvl_over_time': data['tvl'], 'rewards_total': data['rewards']},
+                         version=version, cache_size=0)
+    return version, responses, charts
+
+
+# ═══════════════════════════════════════════════════════════════
+# HTTP APP
+# ═══════════════════════════════════════════════════════════════
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+def _accepts_gzip(accept_encoding):
+    """True if Accept-Encoding allows gzip (explicitly or via '*') with q > 0."""
+    qualities = {}
+    for part in (accept_encoding or '').split(','):
+        coding, *params = [p.strip() for p in part.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            qualities[coding.lower()] = q
+    q = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+    return q > 0
+
+
+async def handle_endpoint(request):
+    name = request.match_info['name']
+    state = request.app['state']
+    entry = state['responses'].get(name)
+    if entry is None:
+        raise web.HTTPNotFound(text=json.dumps({'error': f'unknown endpoint {name}',
+                                                'endpoints': sorted(state['responses'])}),
+                               content_type='application/json')
+
+    return _send(request, entry)
+
+
+def _send(request, entry):
+    """Respond with 304 on ETag match, else the (gzip'd if accepted) body."""
+    headers = {
+        'ETag': entry['etag'],
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+    }
+    if _etag_matches(request.headers.get('If-None-Match'), entry['etag']):
+        return web.Response(status=304, headers=headers)
+
+    if _accepts_gzip(request.headers.get('Accept-Encoding')):
+        headers['Content-Encoding'] = 'gzip'
+        body = entry['gzip']
+    else:
+        body = entry['body']
+    return web.Response(body=body, headers=headers, content_type='application/json')
+
+
+def _chart_entry(charts, version, key, series, points, start, end):
+    return _entry(version, key, charts.get(series, points, start, end))
+
+
+async def handle_chart(request):
+    # Snapshot so a concurrent refresh can't mix versions
+    state = dict(request.app['state'])
+    charts, cache = state['charts'], state['charts_cache']
+    try:
+        points = min(max(int(request.query.get('points', 500)), 3), MAX_CHART_POINTS)
+        series, points, start, end = charts.normalize(request.match_info['series'], points,
+                                                      request.query.get('start'), request.query.get('end'))
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=json.dumps({'error': str(e)}), content_type='application/json')
+
+    fmt = lambda ts: f'{ts:%Y-%m-%d}' if ts is not None else ''
+    key = f'chart-{series}-{points}-{fmt(start)}-{fmt(end)}'
+    entry = cache.get(key)
+    if entry is None:
+        # Downsampling (one LTTB per collateral for tvl_by_collateral) runs off the event loop
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, _chart_entry, charts, state['version'],
+                                           key, series, points, start, end)
+        cache.put(key, entry)
+    return _send(request, entry)
+
+
+async def handle_index(request):
+    state = request.app['state']
+    return web.json_response({
+        'version': state['version'],
+        'endpoints': [f'/api/{name}' for name in sorted(state['responses'])],
+        'charts': [f'/api/chart/{name}' for name in ChartSeries.SERIES],
+    })
+
+
+async def _refresh(app):
+    """Recompute all responses off the event loop and swap them in."""
+    state = app['state']
+    loop = asyncio.get_running_loop()
+    version, responses, charts = await loop.run_in_executor(None, build_responses, app['data_dir'])
+    # Swapped on the event loop, so readers never see a half-built snapshot
+    state.update(version=version, responses=responses, charts=charts,
+                 charts_cache=LRUCache(CHART_CACHE_SIZE))
+    print(f"✅ Data version {version}: {len(responses)} endpoints ready")
+
+
+async def _watch(app):
+    """Poll the data files and recompute when their fingerprint changes."""
+    while True:
+        await asyncio.sleep(app['poll_interval'])
+        try:
+            if data_version(app['data_dir']) != app['state']['version']:
+                print("🔄 Data files changed, recomputing...")
+                await _refresh(app)
+        except Exception as e:
+            # Keep serving the last good snapshot
+            print(f"⚠️  Recompute failed ({e})")
+
+
+async def _on_startup(app):
+    await _refresh(app)
+    app['watcher'] = asyncio.create_task(_watch(app))
+
+
+async def _on_cleanup(app):
+    app['watcher'].cancel()
+
+
+def create_app(data_dir='data', poll_interval=5.0):
+    """
+    Build the aiohttp application.
+
+    Args:
+        data_dir: Directory holding the exported CSVs
+        poll_interval: Seconds between data file change checks
+
+    Returns:
+        aiohttp.web.Application
+    """
+    app = web.Application()
+    app['data_dir'] = data_dir
+    app['poll_interval'] = poll_interval
+    app['state'] = {'version': None, 'responses': {}, 'charts': None,
+                    'charts_cache': LRUCache(CHART_CACHE_SIZE)}
+    app.router.add_get('/api', handle_index)
+    app.router.add_get('/api/chart/{series}', handle_chart)
+    app.router.add_get('/api/{name}', handle_endpoint)
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def run_server(data_dir='data', host='127.0.0.1', port=8080, poll_interval=5.0):
+    """
+    Run the dashboard API server (blocking).
+    """
+    print(f"🚀 Serving {data_dir}/ on http://{host}:{port}/api")
+    web.run_app(create_app(data_dir, poll_interval), host=host, port=port, print=None)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Symbiotic dashboard API server')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    args = parser.parse_args()
+    run_server(args.data_dir, args.host, args.port, args.poll_interval)
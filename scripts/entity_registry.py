@@ -0,0 +1,391 @@
+"""
+Symbiotic Entity Registry
+=========================
+Normalize vaults, collaterals, payout tokens and networks across the data/
+files into dense integer IDs, store the datasets with those compact codes,
+and prebuild join indexes so cross-dataset joins are integer array lookups.
+
+Usage in Hex:
+    from scripts.entity_registry import encode_datasets
+    encoded = encode_datasets(load_all_data())
+    encoded.daily_rewards_for_network('Tanssi Network')
+    encoded.vaults_for_collateral('wstETH')
+    encoded.memory_report()
+"""
+
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+MISSING = -1
+
+# ═══════════════════════════════════════════════════════════════
+# NORMALIZATION
+# ═══════════════════════════════════════════════════════════════
+
+def normalize_names(values) -> pd.Series:
+    """Strip whitespace; blank / NaN names become NaN."""
+    s = pd.Series(values, dtype='object').astype('string').str.strip()
+    return s.mask(s == '').astype('object')
+
+
+def normalize_addresses(values) -> pd.Series:
+    """Lower-case hex addresses so checksummed and plain forms match."""
+    return normalize_names(values).str.lower()
+
+
+def parse_token_list(value) -> List[str]:
+    """Parse a stringified list like "['HYPER']" (or a bare symbol) into symbols."""
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    text = str(value).strip()
+    try:
+        parsed = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        parsed = text
+    if isinstance(parsed, (list, tuple)):
+        return [str(v).strip() for v in parsed if str(v).strip()]
+    return [str(parsed).strip()] if str(parsed).strip() else []
+
+
+def _is_address(value) -> bool:
+    return isinstance(value, str) and value.lower().startswith('0x')
+
+
+# ═══════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════
+
+class EntityRegistry:
+    """
+    Dense integer IDs per entity kind ('vault', 'collateral', 'token', 'network').
+
+    IDs are positions in the kind's label index; values not in the registry
+    encode to MISSING (-1), like pandas Categorical codes.
+    """
+
+    KINDS = ('vault', 'collateral', 'token', 'network')
+
+    def __init__(self):
+        self._labels = {kind: pd.Index([], dtype='object') for kind in self.KINDS}
+        # Collaterals are known by symbol and/or address -> one shared ID
+        self.collaterals = pd.DataFrame({'symbol': pd.Series(dtype='object'),
+                                         'address': pd.Series(dtype='object')})
+        self._collateral_lookup: Dict[str, int] = {}
+
+    def copy(self):
+        """Independent copy (adding names to it leaves this registry's IDs alone)."""
+        other = EntityRegistry()
+        other._labels = dict(self._labels)
+        other.collaterals = self.collaterals.copy()
+        other._collateral_lookup = dict(self._collateral_lookup)
+        return other
+
+    # ── registration ──────────────────────────────────────────
+
+    def add(self, kind, values):
+        """Register new vault / token / network names (normalized)."""
+        if kind == 'collateral':
+            return self.add_collaterals(values)
+        norm = normalize_addresses(values) if kind == 'vault' else normalize_names(values)
+        new = pd.Index(norm.dropna().unique()).difference(self._labels[kind], sort=False)
+        self._labels[kind] = self._labels[kind].append(pd.Index(sorted(new), dtype='object'))
+        return self
+
+    def add_collaterals(self, symbols=None, addresses=None):
+        """
+        Register collaterals from aligned symbol / address arrays.
+
+        A bare value that looks like an address ("0x...") is treated as one.
+        """
+        n = len(symbols) if symbols is not None else len(addresses)
+        sym = normalize_names(symbols if symbols is not None else [None] * n)
+        addr = normalize_addresses(addresses if addresses is not None else [None] * n)
+        # tvl_by_vault puts the address in the symbol column when no symbol is known
+        as_addr = sym.map(_is_address).astype(bool)
+        addr = addr.where(~as_addr, sym.str.lower())
+        sym = sym.mask(as_addr)
+
+        pairs = pd.DataFrame({'symbol': sym.values, 'address': addr.values}).dropna(how='all')
+        for symbol, address in pairs.drop_duplicates().itertuples(index=False):
+            cid = self._collateral_lookup.get(address) if isinstance(address, str) else None
+            if cid is None and isinstance(symbol, str):
+                # Match by symbol unless it belongs to a different address
+                cid = self._collateral_lookup.get(symbol)
+                if cid is not None and isinstance(address, str) \
+                        and not pd.isna(self.collaterals.at[cid, 'address']):
+                    cid = None
+            if cid is None:
+                cid = len(self.collaterals)
+                self.collaterals.loc[cid] = [symbol if isinstance(symbol, str) else None,
+                                             address if isinstance(address, str) else None]
+            else:
+                # Fill in whichever half was unknown so far
+                if isinstance(symbol, str) and pd.isna(self.collaterals.at[cid, 'symbol']):
+                    self.collaterals.at[cid, 'symbol'] = symbol
+                if isinstance(address, str) and pd.isna(self.collaterals.at[cid, 'address']):
+                    self.collaterals.at[cid, 'address'] = address
+            for key in (symbol, address):
+                if isinstance(key, str):
+                    self._collateral_lookup.setdefault(key, cid)
+        # Label by symbol; fall back to address when missing or ambiguous
+        symbol = self.collaterals['symbol']
+        label = symbol.where(~symbol.duplicated(keep=False), self.collaterals['address'])
+        self._labels['collateral'] = pd.Index(label.fillna(self.collaterals['address']).to_numpy(), dtype='object')
+        return self
+
+    # ── lookups ───────────────────────────────────────────────
+
+    def labels(self, kind) -> pd.Index:
+        """Labels indexed by ID."""
+        return self._labels[kind]
+
+    def size(self, kind) -> int:
+        return len(self._labels[kind])
+
+    def encode(self, kind, values) -> np.ndarray:
+        """Vectorized label -> ID (int32, MISSING for unknown / blank)."""
+        if kind == 'collateral':
+            keys = normalize_names(values)
+            keys = keys.where(~keys.map(_is_address).astype(bool), keys.str.lower())
+            codes = keys.map(self._collateral_lookup)
+        elif kind == 'vault':
+            codes = pd.Series(self._labels[kind].get_indexer(normalize_addresses(values)))
+        else:
+            codes = pd.Series(self._labels[kind].get_indexer(normalize_names(values)))
+        return codes.fillna(MISSING).to_numpy(dtype=np.int32)
+
+    def decode(self, kind, codes) -> np.ndarray:
+        """IDs -> labels (None for MISSING)."""
+        codes = np.asarray(codes)
+        labels = self._labels[kind].to_numpy(dtype=object)
+        out = np.full(codes.shape, None, dtype=object)
+        valid = codes >= 0
+        out[valid] = labels[codes[valid]]
+        return out
+
+    def categorical(self, kind, values) -> pd.Categorical:
+        """Compact Categorical sharing the registry's label order."""
+        return pd.Categorical.from_codes(self.encode(kind, values), categories=self._labels[kind])
+
+    def summary(self) -> pd.DataFrame:
+        return pd.DataFrame({'Entity': list(self.KINDS),
+                             'Count': [self.size(kind) for kind in self.KINDS]})
+
+
+# ═══════════════════════════════════════════════════════════════
+# JOIN INDEXES
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class JoinIndex:
+    """
+    One-to-many index from entity ID to dataset rows (CSR layout).
+
+    Rows for entity i are order[offsets[i]:offsets[i + 1]].
+    """
+    order: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def build(cls, codes, n_entities):
+        codes = np.asarray(codes)
+        order = np.argsort(codes, kind='stable')
+        n_missing = int((codes < 0).sum())
+        counts = np.bincount(codes[codes >= 0], minlength=n_entities)
+        offsets = np.concatenate([[0], np.cumsum(counts)]) + n_missing
+        return cls(order=order, offsets=offsets)
+
+    def rows(self, entity_id) -> np.ndarray:
+        return self.order[self.offsets[entity_id]:self.offsets[entity_id + 1]]
+
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+
+# ═══════════════════════════════════════════════════════════════
+# ENCODED DATASETS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class EncodedDatasets:
+    """Datasets stored with integer entity codes, plus prebuilt join indexes."""
+    registry: EntityRegistry
+    tables: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    indexes: Dict[str, JoinIndex] = field(default_factory=dict)
+    # Dense per-network lookup (NaN where unknown)
+    network_stake: np.ndarray = None
+    original_bytes: int = 0
+
+    def daily_rewards_for_network(self, network) -> pd.DataFrame:
+        """Daily rewards rows for one network (name or ID)."""
+        nid = network if isinstance(network, (int, np.integer)) else self.registry.encode('network', [network])[0]
+        if nid == MISSING:
+            return self.tables['rewards_by_network'].iloc[0:0]
+        return self.tables['rewards_by_network'].iloc[self.indexes['network_daily_rewards'].rows(nid)]
+
+    def vaults_for_collateral(self, collateral) -> pd.DataFrame:
+        """Vault rows backed by one collateral (symbol, address or ID)."""
+        cid = collateral if isinstance(collateral, (int, np.integer)) else self.registry.encode('collateral', [collateral])[0]
+        if cid == MISSING:
+            return self.tables['tvl_by_vault'].iloc[0:0]
+        return self.tables['tvl_by_vault'].iloc[self.indexes['collateral_vaults'].rows(cid)]
+
+    def rewards_with_stake(self) -> pd.DataFrame:
+        """Daily rewards joined to network stake via the dense stake array."""
+        df = self.tables['rewards_by_network'].copy()
+        codes = df['network_id'].to_numpy()
+        stake = np.full(len(df), np.nan)
+        valid = codes >= 0
+        stake[valid] = self.network_stake[codes[valid]]
+        df['network_stake_usd'] = stake
+        return df
+
+    def memory_report(self) -> pd.DataFrame:
+        encoded = sum(df.memory_usage(deep=True).sum() for df in self.tables.values())
+        return pd.DataFrame({
+            'Metric': ['Original (bytes)', 'Encoded (bytes)', 'Reduction %'],
+            'Value': [self.original_bytes, encoded,
+                      round((1 - encoded / self.original_bytes) * 100, 1) if self.original_bytes else 0],
+        })
+
+
+def _smallest_int(codes, n):
+    """Downcast codes to the smallest signed dtype that holds n IDs plus MISSING."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return codes.astype(dtype)
+    return codes.astype(np.int64)
+
+
+def build_registry(data) -> EntityRegistry:
+    """
+    Register every entity found in the datasets (dict from load_all_data()).
+    """
+    reg = EntityRegistry()
+    if 'tvl_over_time' in data and len(data['tvl_over_time']):
+        df = data['tvl_over_time']
+        reg.add_collaterals(df['symbol'].values, df['collateral_address'].values)
+    if 'tvl_by_collateral' in data and len(data['tvl_by_collateral']):
+        reg.add_collaterals(data['tvl_by_collateral']['symbol'].values)
+    if 'tvl_by_vault' in data and len(data['tvl_by_vault']):
+        df = data['tvl_by_vault']
+        reg.add_collaterals(df['collateral'].values)
+        reg.add('vault', df['vault'].values)
+    for name, col in [('rewards_by_network', 'network_name'),
+                      ('rewards_total', 'network_name'),
+                      ('network_rewards', 'Network')]:
+        if name in data and col in data[name].columns:
+            reg.add('network', data[name][col].values)
+    if 'network_rewards' in data and 'Payout Token' in data['network_rewards'].columns:
+        tokens = [t for v in data['network_rewards']['Payout Token'] for t in parse_token_list(v)]
+        reg.add('token', tokens)
+    return reg
+
+
+def encode_datasets(data, registry: EntityRegistry = None) -> EncodedDatasets:
+    """
+    Encode the datasets with integer entity IDs and build the join indexes.
+
+    Args:
+        data: dict of DataFrames (from load_all_data / fetch_csv_from_github)
+        registry: Optional existing registry (built from data if None)
+
+    Returns:
+        EncodedDatasets
+    """
+    reg = registry or build_registry(data)
+    n = {kind: reg.size(kind) for kind in reg.KINDS}
+    enc = EncodedDatasets(registry=reg)
+    # All-NaN until network_rewards fills it (it may be missing or empty)
+    enc.network_stake = np.full(n['network'], np.nan)
+    used = set()
+
+    def code(kind, values):
+        return _smallest_int(reg.encode(kind, values), n[kind])
+
+    if 'tvl_over_time' in data and len(data['tvl_over_time']):
+        df = data['tvl_over_time']
+        enc.tables['tvl_over_time'] = pd.DataFrame({
+            'dt': pd.to_datetime(df['dt']),
+            'collateral_id': code('collateral', df['collateral_address'].values),
+            'tvl_usd': df['TVL_usd'].to_numpy(dtype=np.float64),
+        })
+        used.add('tvl_over_time')
+
+    if 'tvl_by_collateral' in data and len(data['tvl_by_collateral']):
+        df = data['tvl_by_collateral']
+        enc.tables['tvl_by_collateral'] = pd.DataFrame({
+            'collateral_id': code('collateral', df['symbol'].values),
+            'tvl_usd': df['TVL_usd'].to_numpy(dtype=np.float64),
+        })
+        used.add('tvl_by_collateral')
+
+    if 'tvl_by_vault' in data and len(data['tvl_by_vault']):
+        df = data['tvl_by_vault']
+        table = df.drop(columns=['vault', 'collateral'])
+        for col in ['delegator_type', 'label', 'slasher_type']:
+            if col in table.columns:
+                table[col] = table[col].astype('category')
+        table.insert(0, 'vault_id', code('vault', df['vault'].values))
+        table.insert(1, 'collateral_id', code('collateral', df['collateral'].values))
+        enc.tables['tvl_by_vault'] = table
+        used.add('tvl_by_vault')
+
+    for name in ['rewards_by_network', 'rewards_total']:
+        if name in data and len(data[name]):
+            df = data[name]
+            table = df.drop(columns=['network_name'])
+            table['dt'] = pd.to_datetime(table['dt'])
+            table.insert(1, 'network_id', code('network', df['network_name'].values))
+            enc.tables[name] = table
+            used.add(name)
+
+    if 'network_rewards' in data and len(data['network_rewards']):
+        df = data['network_rewards']
+        nids = reg.encode('network', df['Network'].values)
+        enc.tables['network_rewards'] = pd.DataFrame({
+            'network_id': _smallest_int(nids, n['network']),
+            'distributions': df['Distributions'].to_numpy(),
+            'network_stake_usd': df['Network Stake USD'].to_numpy(dtype=np.float64),
+            'total_distributed_usd': df['Total Distributed USD'].to_numpy(dtype=np.float64),
+        })
+        # Multi-valued payout tokens become an edge table
+        tokens = df['Payout Token'].map(parse_token_list)
+        lengths = tokens.map(len).to_numpy()
+        enc.tables['network_tokens'] = pd.DataFrame({
+            'network_id': _smallest_int(np.repeat(nids, lengths), n['network']),
+            'token_id': code('token', [t for ts in tokens for t in ts]),
+        })
+        valid = nids >= 0
+        enc.network_stake[nids[valid]] = df['Network Stake USD'].to_numpy(dtype=np.float64)[valid]
+        used.add('network_rewards')
+
+    # Join indexes
+    if 'rewards_by_network' in enc.tables:
+        enc.indexes['network_daily_rewards'] = JoinIndex.build(
+            enc.tables['rewards_by_network']['network_id'].to_numpy(), n['network'])
+    if 'network_tokens' in enc.tables:
+        enc.indexes['network_tokens'] = JoinIndex.build(
+            enc.tables['network_tokens']['network_id'].to_numpy(), n['network'])
+    if 'tvl_by_vault' in enc.tables:
+        enc.indexes['collateral_vaults'] = JoinIndex.build(
+            enc.tables['tvl_by_vault']['collateral_id'].to_numpy(), n['collateral'])
+    if 'tvl_over_time' in enc.tables:
+        enc.indexes['collateral_daily_tvl'] = JoinIndex.build(
+            enc.tables['tvl_over_time']['collateral_id'].to_numpy(), n['collateral'])
+
+    enc.original_bytes = int(sum(data[name].memory_usage(deep=True).sum() for name in used))
+    return enc
+
+
+# Print available functions
+print("📊 Entity Registry loaded!")
+print("   → encode_datasets(data)")
+print("   → build_registry(data)")
+print("   → EntityRegistry / JoinIndex")
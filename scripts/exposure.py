@@ -0,0 +1,290 @@
+"""
+Symbiotic Exposure Engine
+=========================
+Sparse vault x network / vault x operator / vault x collateral exposure
+matrices (scipy.sparse) and the risk metrics computed from them for every
+entity at once: concentration (HHI, top-k share), restaking leverage and
+revenue at risk if a network or collateral is slashed.
+
+tvl_by_vault.csv only carries *counts* of networks and operators per vault,
+so vault x network / vault x operator matrices need an edge list
+(vault, network|operator[, stake]). Without one, vault-level concentration
+falls back to an equal split over the reported counts.
+
+Usage in Hex:
+    from scripts.exposure import ExposureEngine
+    engine = ExposureEngine(data['tvl_by_vault'], network_edges=edges, total_revenue=metrics['protocol_revenue'])
+    engine.vault_metrics()
+    engine.network_metrics(slash_fraction=0.1)
+    engine.collateral_metrics(slash_fraction=0.1)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .entity_registry import EntityRegistry, build_registry, normalize_names
+
+# ═══════════════════════════════════════════════════════════════
+# SPARSE HELPERS
+# ═══════════════════════════════════════════════════════════════
+
+def _ratio(num, den):
+    """Elementwise num / den with NaN where den == 0."""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def _nan_to_zero(x):
+    return np.nan_to_num(x, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def row_sums(m) -> np.ndarray:
+    return np.asarray(m.sum(axis=1)).ravel()
+
+
+def row_hhi(m) -> np.ndarray:
+    """Herfindahl index of each row's weights (NaN for empty rows)."""
+    return _ratio(row_sums(m.multiply(m)), row_sums(m) ** 2)
+
+
+def row_top_k_share(m, k) -> np.ndarray:
+    """Share of each row's total held by its k largest entries."""
+    m = sparse.csr_matrix(m)
+    m.sum_duplicates()
+    rows = np.repeat(np.arange(m.shape[0]), np.diff(m.indptr))
+    # Sort entries by row, then descending weight; rank within row
+    order = np.lexsort((-m.data, rows))
+    ranks = np.arange(len(order)) - m.indptr[rows[order]]
+    keep = order[ranks < k]
+    top = np.bincount(rows[keep], weights=m.data[keep], minlength=m.shape[0])
+    return _ratio(top, row_sums(m))
+
+
+def exposure_matrix(row_ids, col_ids, weights, shape) -> sparse.csr_matrix:
+    """CSR matrix from (row, col, weight) triples; unknown IDs (-1) are dropped."""
+    row_ids = np.asarray(row_ids)
+    col_ids = np.asarray(col_ids)
+    valid = (row_ids >= 0) & (col_ids >= 0)
+    return sparse.csr_matrix((np.asarray(weights, dtype=np.float64)[valid],
+                              (row_ids[valid], col_ids[valid])), shape=shape)
+
+
+def _check_edges(edges, entity_col, name):
+    """Validate an edge list: 'vault', entity_col and an optional numeric 'stake'."""
+    if edges is None:
+        return
+    missing = [col for col in ('vault', entity_col) if col not in edges.columns]
+    if missing:
+        raise ValueError(f"❌ {name} needs columns ['vault', '{entity_col}'(, 'stake')]; "
+                         f"missing {missing}")
+    if 'stake' in edges.columns and not pd.api.types.is_numeric_dtype(edges['stake']):
+        raise ValueError(f"❌ {name} 'stake' column must be numeric")
+
+
+# ═══════════════════════════════════════════════════════════════
+# ENGINE
+# ═══════════════════════════════════════════════════════════════
+
+class ExposureEngine:
+    """
+    Exposure matrices over vaults and the metrics derived from them.
+
+    Args:
+        df_vaults: tvl_by_vault DataFrame (vault, collateral, tvl, delegated_stake, ...)
+        network_edges: Optional DataFrame (vault, network[, stake])
+        operator_edges: Optional DataFrame (vault, operator[, stake])
+        registry: Optional EntityRegistry (built from df_vaults if None); copied
+                  before edge networks are added, so the caller's IDs don't change
+        total_revenue: Optional protocol revenue to express revenue at risk in USD
+        vault_revenue: Optional per-vault revenue (aligned with df_vaults); defaults
+                       to total_revenue split by delegated stake
+    """
+
+    def __init__(self, df_vaults, network_edges=None, operator_edges=None,
+                 registry: EntityRegistry = None, total_revenue=None, vault_revenue=None):
+        _check_edges(network_edges, 'network', 'network_edges')
+        _check_edges(operator_edges, 'operator', 'operator_edges')
+        self.registry = registry.copy() if registry is not None else build_registry({'tvl_by_vault': df_vaults})
+        reg = self.registry
+        if network_edges is not None:
+            reg.add('network', network_edges['network'].values)
+
+        self.vault_ids = reg.encode('vault', df_vaults['vault'].values)
+        n_vaults = reg.size('vault')
+        self.n_vaults = n_vaults
+
+        # Dense per-vault vectors indexed by vault ID
+        self.tvl = np.zeros(n_vaults)
+        self.delegated = np.zeros(n_vaults)
+        self.active_networks = np.zeros(n_vaults)
+        self.operators = np.zeros(n_vaults)
+        valid = self.vault_ids >= 0
+        ids = self.vault_ids[valid]
+        self.tvl[ids] = df_vaults['tvl'].to_numpy(dtype=np.float64)[valid]
+        self.delegated[ids] = df_vaults['delegated_stake'].to_numpy(dtype=np.float64)[valid]
+        if 'active_networks' in df_vaults.columns:
+            self.active_networks[ids] = df_vaults['active_networks'].to_numpy(dtype=np.float64)[valid]
+        if 'opted_in_operators' in df_vaults.columns:
+            self.operators[ids] = df_vaults['opted_in_operators'].to_numpy(dtype=np.float64)[valid]
+
+        # Vault x collateral (each vault holds one collateral), weighted by TVL
+        collateral_ids = np.full(n_vaults, -1)
+        collateral_ids[ids] = reg.encode('collateral', df_vaults['collateral'].values)[valid]
+        self.collateral = exposure_matrix(np.arange(n_vaults), collateral_ids, self.tvl,
+                                          (n_vaults, reg.size('collateral')))
+
+        # Vault x network / vault x operator stake
+        self.network = None
+        if network_edges is not None:
+            self.network = self._edge_matrix(network_edges,
+                                             reg.encode('network', network_edges['network'].values),
+                                             reg.size('network'))
+        self.operator = None
+        self.operator_labels = None
+        if operator_edges is not None:
+            codes, labels = pd.factorize(normalize_names(operator_edges['operator'].values), sort=True)
+            self.operator_labels = pd.Index(labels)
+            self.operator = self._edge_matrix(operator_edges, codes, len(labels))
+
+        # Revenue per vault (default: proportional to delegated stake)
+        if vault_revenue is not None:
+            self.revenue = np.zeros(n_vaults)
+            self.revenue[ids] = np.asarray(vault_revenue, dtype=np.float64)[valid]
+        else:
+            total = 1.0 if total_revenue is None else float(total_revenue)
+            self.revenue = total * _ratio(self.delegated, self.delegated.sum())
+        self.total_revenue = total_revenue
+
+    def _edge_matrix(self, edges, entity_ids, n_entities):
+        """
+        Vault x entity stake; without a stake column, split delegated stake evenly
+        over the vault's edges whose vault and entity are both known.
+        """
+        vault_ids = self.registry.encode('vault', edges['vault'].values)
+        if 'stake' in edges.columns:
+            weights = edges['stake'].to_numpy(dtype=np.float64)
+        else:
+            valid = (vault_ids >= 0) & (entity_ids >= 0)
+            per_vault = np.bincount(vault_ids[valid], minlength=self.n_vaults)
+            safe = np.clip(vault_ids, 0, None)
+            weights = np.where(valid, _ratio(self.delegated[safe], per_vault[safe]), 0.0)
+        return exposure_matrix(vault_ids, entity_ids, weights, (self.n_vaults, n_entities))
+
+    # ── vault level ───────────────────────────────────────────
+
+    def vault_metrics(self, k=3) -> pd.DataFrame:
+        """
+        Per-vault leverage and concentration across networks / operators.
+        """
+        df = pd.DataFrame({
+            'Vault': self.registry.labels('vault'),
+            'TVL': self.tvl,
+            'Delegated Stake': self.delegated,
+            'Leverage': _ratio(self.delegated, self.tvl),
+        })
+        if self.network is not None:
+            df['Network HHI'] = row_hhi(self.network)
+            df[f'Top-{k} Network Share'] = row_top_k_share(self.network, k)
+        else:
+            # Equal split over the reported network count
+            df['Network HHI'] = _ratio(1.0, self.active_networks)
+            df[f'Top-{k} Network Share'] = _ratio(np.minimum(k, self.active_networks), self.active_networks)
+        if self.operator is not None:
+            df['Operator HHI'] = row_hhi(self.operator)
+            df[f'Top-{k} Operator Share'] = row_top_k_share(self.operator, k)
+        else:
+            df['Operator HHI'] = _ratio(1.0, self.operators)
+            df[f'Top-{k} Operator Share'] = _ratio(np.minimum(k, self.operators), self.operators)
+        df['Revenue Share %'] = _ratio(self.revenue, self.revenue.sum()) * 100
+        return df.sort_values('TVL', ascending=False)
+
+    # ── network / operator level ──────────────────────────────
+
+    def _entity_metrics(self, m, labels, name, k, slash_fraction):
+        mt = sparse.csr_matrix(m.T)
+        stake = row_sums(mt)
+        # Collateral actually backing each entity: stake scaled by each vault's tvl / delegated
+        backing = mt @ _nan_to_zero(_ratio(self.tvl, self.delegated))
+        # Slashing f of an entity's allocation removes f * (allocation / delegated) of the vault
+        at_risk = slash_fraction * (mt @ _nan_to_zero(_ratio(self.revenue, self.delegated)))
+        df = pd.DataFrame({
+            name: labels,
+            'Stake': stake,
+            'Backing Collateral': backing,
+            'Leverage': _ratio(stake, backing),
+            'Vaults': np.diff(mt.indptr),
+            'Vault HHI': row_hhi(mt),
+            f'Top-{k} Vault Share': row_top_k_share(mt, k),
+            'Revenue at Risk %': _ratio(at_risk, self.revenue.sum()) * 100,
+        })
+        if self.total_revenue is not None:
+            df['Revenue at Risk'] = at_risk
+        return df.sort_values('Stake', ascending=False)
+
+    def network_metrics(self, k=3, slash_fraction=1.0) -> pd.DataFrame:
+        """
+        Per-network stake, leverage, vault concentration and revenue at risk if slashed.
+        """
+        if self.network is None:
+            raise ValueError("❌ network_edges required (tvl_by_vault only has network counts)")
+        return self._entity_metrics(self.network, self.registry.labels('network'), 'Network', k, slash_fraction)
+
+    def operator_metrics(self, k=3, slash_fraction=1.0) -> pd.DataFrame:
+        """
+        Per-operator stake, leverage, vault concentration and revenue at risk if slashed.
+        """
+        if self.operator is None:
+            raise ValueError("❌ operator_edges required (tvl_by_vault only has operator counts)")
+        return self._entity_metrics(self.operator, self.operator_labels, 'Operator', k, slash_fraction)
+
+    # ── collateral level ──────────────────────────────────────
+
+    def collateral_metrics(self, k=3, slash_fraction=1.0) -> pd.DataFrame:
+        """
+        Per-collateral TVL share, vault concentration and revenue at risk if the
+        collateral is slashed / depegs by slash_fraction.
+        """
+        ct = sparse.csr_matrix(self.collateral.T)
+        tvl = row_sums(ct)
+        holders = (ct > 0).astype(np.float64)
+        at_risk = slash_fraction * (holders @ self.revenue)
+        df = pd.DataFrame({
+            'Collateral': self.registry.labels('collateral'),
+            'TVL': tvl,
+            'TVL Share %': _ratio(tvl, tvl.sum()) * 100,
+            'Vaults': np.diff(ct.indptr),
+            'Vault HHI': row_hhi(ct),
+            f'Top-{k} Vault Share': row_top_k_share(ct, k),
+            'Revenue at Risk %': _ratio(at_risk, self.revenue.sum()) * 100,
+        })
+        if self.total_revenue is not None:
+            df['Revenue at Risk'] = at_risk
+        return df[df['Vaults'] > 0].sort_values('TVL', ascending=False)
+
+    def summary(self) -> dict:
+        """
+        System-wide concentration and leverage.
+        """
+        collateral_tvl = row_sums(sparse.csr_matrix(self.collateral.T))
+        out = {
+            'total_tvl': self.tvl.sum(),
+            'total_delegated': self.delegated.sum(),
+            'leverage': _ratio(self.delegated.sum(), self.tvl.sum()).item(),
+            'vault_hhi': row_hhi(sparse.csr_matrix(self.tvl))[0],
+            'collateral_hhi': row_hhi(sparse.csr_matrix(collateral_tvl))[0],
+        }
+        if self.network is not None:
+            out['network_hhi'] = row_hhi(sparse.csr_matrix(self.network.sum(axis=0)))[0]
+        if self.operator is not None:
+            out['operator_hhi'] = row_hhi(sparse.csr_matrix(self.operator.sum(axis=0)))[0]
+        return out
+
+
+# Print available functions
+print("📊 Exposure Engine loaded!")
+print("   → ExposureEngine(df_vaults, network_edges, operator_edges)")
+print("   → .vault_metrics() / .network_metrics() / .collateral_metrics() / .summary()")
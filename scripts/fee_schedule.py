@@ -0,0 +1,313 @@
+"""
+Symbiotic Fee & OpEx Schedules
+==============================
+Dated fee-rate and opex schedules (optionally per network / vault tier),
+applied to daily rewards with a vectorized as-of lookup instead of one flat
+fee_rate over all history.
+
+Usage in Hex:
+    from scripts.fee_schedule import DatedSchedule, calculate_daily_pl, backfill_fee_scenarios
+    fees = DatedSchedule([('2025-01-01', 0.0), ('2026-01-01', 0.10)])
+    opex = DatedSchedule([('2025-01-01', 474000), ('2025-10-01', 520000)])
+    calculate_daily_pl(df_rewards, fees, opex, time_col='dt')
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .compute_backend import resolve_backend, read_source, duckdb_daily_totals
+
+# ═══════════════════════════════════════════════════════════════
+# SCHEDULE
+# ═══════════════════════════════════════════════════════════════
+
+def _to_datetime64(dates) -> np.ndarray:
+    """datetime64[ns] array, skipping parsing when dates already are datetimes."""
+    arr = np.asarray(dates)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype('datetime64[ns]')
+    return pd.to_datetime(pd.Series(dates)).astype('datetime64[ns]').to_numpy()
+
+
+@dataclass
+class DatedSchedule:
+    """
+    Values (fee rates or monthly opex) that take effect on a date.
+
+    entries: list of (effective_date, value) or (effective_date, value, key)
+             tuples, or a DataFrame with those columns. Rows without a key are
+             the default schedule; keyed rows (network name, vault tier, ...)
+             override it for matching keys.
+    initial: Value before the first effective date
+    """
+
+    entries: object = None
+    initial: float = 0.0
+
+    def __post_init__(self):
+        if isinstance(self.entries, pd.DataFrame):
+            table = self.entries.copy()
+            if 'key' not in table.columns:
+                table['key'] = None
+        else:
+            rows = [tuple(e) + (None,) * (3 - len(e)) for e in (self.entries or [])]
+            table = pd.DataFrame(rows, columns=['effective_date', 'value', 'key'])
+        table['effective_date'] = pd.to_datetime(table['effective_date']).astype('datetime64[ns]')
+        table['value'] = table['value'].astype('float64')
+        table['key'] = table['key'].astype(object).where(table['key'].notna(), None)
+        self.table = table.sort_values(['effective_date'], kind='mergesort').reset_index(drop=True)
+
+    @classmethod
+    def flat(cls, value):
+        """A schedule with one value for all dates."""
+        return cls([], initial=value)
+
+    def lookup(self, dates, keys=None) -> np.ndarray:
+        """
+        As-of value for each date (and key), vectorized.
+
+        Args:
+            dates: Array-like of dates
+            keys: Optional array-like (or Categorical, cheapest) of keys aligned with dates
+
+        Returns:
+            float64 numpy array (NaN for missing dates)
+        """
+        dates = _to_datetime64(dates)
+        nat = np.isnat(dates)
+        default = self.table[self.table['key'].isna()]
+        eff = default['effective_date'].to_numpy()
+        vals = default['value'].to_numpy()
+        pos = np.searchsorted(eff, dates, side='right') - 1
+        out = np.full(len(dates), self.initial, dtype=np.float64)
+        if len(vals):
+            out = np.where(pos >= 0, vals[np.clip(pos, 0, None)], out)
+
+        out[nat] = np.nan
+
+        keyed = self.table[self.table['key'].notna()]
+        if keys is None or keyed.empty:
+            return out
+
+        # Keyed rows: searchsorted on a composite (key code, seconds) integer so
+        # every key's as-of lookup happens in one pass
+        key_index = pd.Index(keyed['key'].unique(), dtype=object)
+        key_codes = key_index.get_indexer(keyed['key'])
+        if isinstance(keys, pd.Categorical):
+            # Map the (few) categories, then take by code
+            cat_codes = np.append(key_index.get_indexer(pd.Index(keys.categories, dtype=object)), -1)
+            row_codes = cat_codes[keys.codes]
+        else:
+            row_codes = key_index.get_indexer(pd.Index(pd.Series(keys, dtype=object)))
+        eff_s = keyed['effective_date'].to_numpy().astype('datetime64[s]').astype(np.int64)
+        # NaT would be INT64_MIN and overflow the composite key - park it on a
+        # real date (its result stays NaN)
+        row_s = np.where(nat, eff_s.min(), dates.astype('datetime64[s]').astype(np.int64))
+        lo = min(eff_s.min(), row_s.min()) if len(row_s) else eff_s.min()
+        span = max(eff_s.max(), row_s.max() if len(row_s) else eff_s.max()) - lo + 1
+        eff_comp = key_codes * span + (eff_s - lo)
+        order = np.argsort(eff_comp, kind='stable')
+        eff_comp, key_codes = eff_comp[order], key_codes[order]
+        keyed_vals = keyed['value'].to_numpy()[order]
+
+        pos = np.searchsorted(eff_comp, np.maximum(row_codes, 0) * span + (row_s - lo), side='right') - 1
+        safe = np.clip(pos, 0, None)
+        hit = (row_codes >= 0) & (pos >= 0) & (key_codes[safe] == row_codes) & ~nat
+        out[hit] = keyed_vals[safe[hit]]
+        return out
+
+    def describe(self) -> str:
+        """Short human-readable summary for display."""
+        parts = [f"{self.initial:g} initially"]
+        for row in self.table.itertuples(index=False):
+            key = f" [{row.key}]" if row.key is not None else ''
+            parts.append(f"{row.value:g} from {row.effective_date:%Y-%m-%d}{key}")
+        return ', '.join(parts)
+
+
+# ═══════════════════════════════════════════════════════════════
+# DAILY GROSS REWARDS
+# ═══════════════════════════════════════════════════════════════
+
+def daily_gross(df_rewards, time_col='time', amount_col=None, key_col=None, backend=None):
+    """
+    Daily gross rewards (per key if key_col) -> DataFrame ['Date', ('Key',) 'Gross Rewards'].
+    """
+    if resolve_backend(backend) == 'duckdb':
+        daily = duckdb_daily_totals(df_rewards, time_col, amount_col, key_col)
+        daily['Date'] = pd.to_datetime(daily['Date'])
+        return daily
+
+    df = read_source(df_rewards)
+
+    # Auto-detect amount column
+    if amount_col is None:
+        for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']:
+            if col in df.columns:
+                amount_col = col
+                break
+        if amount_col is None:
+            numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+            amount_col = numeric_cols[0] if len(numeric_cols) > 0 else None
+
+    daily = pd.DataFrame({'Date': pd.to_datetime(df[time_col]).dt.normalize(),
+                          'Gross Rewards': df[amount_col]})
+    by = ['Date']
+    if key_col is not None:
+        daily.insert(1, 'Key', df[key_col].astype(object).where(df[key_col].notna(), None))
+        by.append('Key')
+    # dropna=False below keeps Key=None rows; rows without a date are dropped (as in DuckDB)
+    daily = daily[daily['Date'].notna()]
+    daily = daily.groupby(by, as_index=False, dropna=False, sort=True)['Gross Rewards'].sum()
+    if key_col is not None:
+        # groupby infers a string dtype (NaN for missing); keep None like duckdb_daily_totals
+        daily['Key'] = daily['Key'].astype(object).where(daily['Key'].notna(), None)
+    return daily
+
+
+# Opex rule (shared by every P&L that takes an opex schedule): opex is charged
+# for each full calendar month from the first to the last month with rewards,
+# including months in between that have no rewards.
+
+def covered_months(dates) -> pd.PeriodIndex:
+    """Every calendar month from the first to the last date (inclusive)."""
+    dates = pd.to_datetime(pd.Series(dates)).dropna()
+    if dates.empty:
+        return pd.PeriodIndex([], freq='M')
+    return pd.period_range(dates.min(), dates.max(), freq='M')
+
+
+def fill_months(monthly):
+    """
+    Reindex a ['Month', ...] frame ('YYYY-MM' strings) to every covered month,
+    with zeros for months without rewards.
+    """
+    if monthly.empty:
+        return monthly
+    months = covered_months(pd.PeriodIndex(monthly['Month'], freq='M').to_timestamp()).astype(str)
+    return (monthly.set_index('Month').reindex(months, fill_value=0.0)
+            .rename_axis('Month').reset_index())
+
+
+def _monthly_opex(months, opex_schedule, monthly_opex):
+    """Opex per month (Period array) from the schedule, or the flat amount."""
+    if opex_schedule is None:
+        return np.full(len(months), float(monthly_opex))
+    return opex_schedule.lookup(months.to_timestamp())
+
+
+# ═══════════════════════════════════════════════════════════════
+# P&L WITH SCHEDULES
+# ═══════════════════════════════════════════════════════════════
+
+def calculate_daily_pl(df_rewards, fee_schedule: DatedSchedule, opex_schedule: Optional[DatedSchedule] = None,
+                       monthly_opex=474000, time_col='time', amount_col=None, key_col=None, backend=None):
+    """
+    Daily P&L with dated fee and opex schedules.
+
+    Covers whole calendar months from the first to the last month with rewards,
+    each day carrying monthly opex / days in month, so summed opex matches
+    calculate_monthly_pl and backfill_fee_scenarios.
+
+    Args:
+        df_rewards: DataFrame (or CSV/Parquet path) with rewards data
+        fee_schedule: DatedSchedule of fee rates
+        opex_schedule: DatedSchedule of monthly opex (flat monthly_opex if None)
+        monthly_opex: Flat monthly opex used without an opex schedule
+        time_col: Column name for timestamp
+        amount_col: Column name for amounts (auto-detected if None)
+        key_col: Column matched against schedule keys (e.g. 'network_name')
+        backend: 'pandas' or 'duckdb' (default: current backend)
+
+    Returns:
+        DataFrame with one row per calendar day
+    """
+    gross = daily_gross(df_rewards, time_col, amount_col, key_col, backend)
+    keys = pd.Categorical(gross['Key']) if key_col is not None else None
+    gross['Protocol Revenue'] = gross['Gross Rewards'].to_numpy() * fee_schedule.lookup(gross['Date'], keys)
+
+    daily = gross.groupby('Date')[['Gross Rewards', 'Protocol Revenue']].sum()
+    if len(daily):
+        # Opex accrues on days without rewards too, over whole months
+        months = covered_months(daily.index)
+        days = pd.date_range(months[0].start_time, months[-1].end_time.normalize(), freq='D')
+        daily = daily.reindex(days, fill_value=0.0)
+    daily.index.name = 'Date'
+    daily = daily.reset_index()
+
+    months = daily['Date'].dt.to_period('M')
+    daily['Staker Rewards'] = daily['Gross Rewards'] - daily['Protocol Revenue']
+    daily['Fee Rate'] = (daily['Protocol Revenue'] / daily['Gross Rewards']).where(daily['Gross Rewards'] != 0)
+    daily['Operating Costs'] = (_monthly_opex(pd.PeriodIndex(months), opex_schedule, monthly_opex)
+                                / daily['Date'].dt.days_in_month.to_numpy())
+    daily['Net Income'] = daily['Protocol Revenue'] - daily['Operating Costs']
+    return daily
+
+
+def monthly_revenue_with_schedule(df_rewards, fee_schedule: DatedSchedule, time_col='time',
+                                  amount_col=None, key_col=None, backend=None):
+    """
+    Monthly gross rewards and scheduled protocol revenue -> ['Month', 'Gross Rewards', 'Protocol Revenue'],
+    one row per covered calendar month (zeros where there were no rewards).
+    """
+    gross = daily_gross(df_rewards, time_col, amount_col, key_col, backend)
+    keys = pd.Categorical(gross['Key']) if key_col is not None else None
+    gross['Protocol Revenue'] = gross['Gross Rewards'].to_numpy() * fee_schedule.lookup(gross['Date'], keys)
+    gross['Month'] = gross['Date'].dt.to_period('M')
+    monthly = gross.groupby('Month', as_index=False)[['Gross Rewards', 'Protocol Revenue']].sum()
+    monthly['Month'] = monthly['Month'].astype(str)
+    return fill_months(monthly)
+
+
+def scheduled_opex(months, opex_schedule: Optional[DatedSchedule], monthly_opex=474000) -> np.ndarray:
+    """
+    Opex for each month string ('YYYY-MM').
+    """
+    return _monthly_opex(pd.PeriodIndex(months, freq='M'), opex_schedule, monthly_opex)
+
+
+def backfill_fee_scenarios(df_rewards, fee_schedules: Dict[str, DatedSchedule],
+                           opex_schedule: Optional[DatedSchedule] = None, monthly_opex=474000,
+                           time_col='time', amount_col=None, key_col=None, backend=None):
+    """
+    Backfill many alternative fee schedules over the full daily history.
+
+    Daily gross rewards are aggregated once; each schedule is one vectorized
+    lookup over those days. Opex covers every calendar month from the first
+    to the last month with rewards.
+
+    Returns:
+        DataFrame with one row per schedule
+    """
+    gross = daily_gross(df_rewards, time_col, amount_col, key_col, backend)
+    keys = pd.Categorical(gross['Key']) if key_col is not None else None
+    dates = gross['Date'].to_numpy()
+    amounts = gross['Gross Rewards'].to_numpy()
+    total_gross = amounts.sum()
+
+    total_opex = _monthly_opex(covered_months(gross['Date']), opex_schedule, monthly_opex).sum()
+
+    scenarios = []
+    for name, schedule in fee_schedules.items():
+        revenue = float(amounts @ schedule.lookup(dates, keys))
+        net_income = revenue - total_opex
+        scenarios.append({
+            'Scenario': name,
+            'Gross Rewards': total_gross,
+            'Protocol Revenue': revenue,
+            'Operating Costs': total_opex,
+            'Net Income': net_income,
+            'Effective Fee %': round(revenue / total_gross * 100, 2) if total_gross else 0.0,
+            'Net Margin %': round(net_income / revenue * 100, 1) if revenue else 0.0,
+        })
+    return pd.DataFrame(scenarios)
+
+
+# Print available functions
+print("📊 Fee & OpEx Schedules loaded!")
+print("   → DatedSchedule([(date, value[, key]), ...], initial)")
+print("   → calculate_daily_pl(df_rewards, fee_schedule, opex_schedule)")
+print("   → backfill_fee_scenarios(df_rewards, {name: schedule})")
@@ -5,73 +5,113 @@ Display historic P&L, rewards trends, and TVL over time.
 
 Usage in Hex:
     from scripts.historic_data import display_historic_pl, display_rewards_trends, display_tvl_trends
+
+The calculate_* functions accept a DataFrame or a CSV/Parquet path and take
+backend='pandas' | 'duckdb' (default: scripts.compute_backend.get_backend()).
 """
 
 import pandas as pd
 from IPython.display import HTML, display
 
+from .compute_backend import (
+    resolve_backend,
+    read_source,
+    duckdb_monthly_totals,
+    duckdb_monthly_stats,
+    duckdb_network_totals,
+    duckdb_daily_tvl,
+)
+from .fee_schedule import fill_months, monthly_revenue_with_schedule, scheduled_opex
+
 
 # ═══════════════════════════════════════════════════════════════
 # 1. HISTORIC P&L OVER TIME
 # ═══════════════════════════════════════════════════════════════
 
 def calculate_monthly_pl(df_rewards, time_col='time', amount_col=None, 
-                         fee_rate=0.10, monthly_opex=474000):
+                         fee_rate=0.10, monthly_opex=474000, backend=None,
+                         fee_schedule=None, opex_schedule=None, key_col=None):
     """
     Calculate monthly P&L from rewards data.
     
     Args:
-        df_rewards: DataFrame with rewards data
+        df_rewards: DataFrame (or CSV/Parquet path) with rewards data
         time_col: Column name for timestamp
         amount_col: Column name for amounts (auto-detected if None)
         fee_rate: Protocol fee rate (default 10%)
         monthly_opex: Monthly operating costs
+        backend: 'pandas' or 'duckdb' (default: current backend)
+        fee_schedule: Optional DatedSchedule of fee rates (replaces fee_rate)
+        opex_schedule: Optional DatedSchedule of monthly opex (replaces monthly_opex)
+        key_col: Column matched against schedule keys (e.g. 'network_name')
+    
+    With a schedule, every calendar month from the first to the last month with
+    rewards gets a row (and its opex), including months without rewards.
     
     Returns:
         DataFrame with monthly P&L
     """
-    df = df_rewards.copy()
-    
-    # Auto-detect amount column
-    if amount_col is None:
-        for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']:
-            if col in df.columns:
-                amount_col = col
-                break
+    if fee_schedule is not None:
+        # Rates applied per day (and key) before rolling up to months
+        monthly = monthly_revenue_with_schedule(df_rewards, fee_schedule, time_col,
+                                                amount_col, key_col, backend)
+    elif resolve_backend(backend) == 'duckdb':
+        monthly = duckdb_monthly_totals(df_rewards, time_col, amount_col)
+    else:
+        df = read_source(df_rewards).copy()
+        
+        # Auto-detect amount column
         if amount_col is None:
-            numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
-            amount_col = numeric_cols[0] if len(numeric_cols) > 0 else None
-    
-    # Convert to datetime
-    df[time_col] = pd.to_datetime(df[time_col])
-    df['month'] = df[time_col].dt.to_period('M')
-    
-    # Aggregate by month
-    monthly = df.groupby('month').agg({
-        amount_col: 'sum'
-    }).reset_index()
-    
-    monthly.columns = ['Month', 'Gross Rewards']
+            for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']:
+                if col in df.columns:
+                    amount_col = col
+                    break
+            if amount_col is None:
+                numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+                amount_col = numeric_cols[0] if len(numeric_cols) > 0 else None
+        
+        # Convert to datetime
+        df[time_col] = pd.to_datetime(df[time_col])
+        df['month'] = df[time_col].dt.to_period('M')
+        
+        # Aggregate by month
+        monthly = df.groupby('month').agg({
+            amount_col: 'sum'
+        }).reset_index()
+        
+        monthly.columns = ['Month', 'Gross Rewards']
+        
+        # Format month
+        monthly['Month'] = monthly['Month'].astype(str)
+    
+    if opex_schedule is not None:
+        monthly = fill_months(monthly)
     
     # Calculate P&L components
-    monthly['Protocol Revenue'] = monthly['Gross Rewards'] * fee_rate
-    monthly['Staker Rewards'] = monthly['Gross Rewards'] * (1 - fee_rate)
-    monthly['Operating Costs'] = monthly_opex
+    if fee_schedule is None:
+        monthly['Protocol Revenue'] = monthly['Gross Rewards'] * fee_rate
+        monthly['Staker Rewards'] = monthly['Gross Rewards'] * (1 - fee_rate)
+    else:
+        monthly['Staker Rewards'] = monthly['Gross Rewards'] - monthly['Protocol Revenue']
+    if opex_schedule is None:
+        monthly['Operating Costs'] = monthly_opex
+    else:
+        monthly['Operating Costs'] = scheduled_opex(monthly['Month'], opex_schedule)
     monthly['Net Income'] = monthly['Protocol Revenue'] - monthly['Operating Costs']
     monthly['Net Margin %'] = (monthly['Net Income'] / monthly['Protocol Revenue'] * 100).round(1)
     
-    # Format month
-    monthly['Month'] = monthly['Month'].astype(str)
-    
     return monthly
 
 
 def display_historic_pl(df_rewards, time_col='time', amount_col=None,
-                        fee_rate=0.10, monthly_opex=474000):
+                        fee_rate=0.10, monthly_opex=474000,
+                        fee_schedule=None, opex_schedule=None, key_col=None):
     """
     Display historic P&L table.
     """
-    monthly = calculate_monthly_pl(df_rewards, time_col, amount_col, fee_rate, monthly_opex)
+    monthly = calculate_monthly_pl(df_rewards, time_col, amount_col, fee_rate, monthly_opex,
+                                   fee_schedule=fee_schedule, opex_schedule=opex_schedule,
+                                   key_col=key_col)
     
     # Create display version with formatting
     display_df = monthly.copy()
@@ -104,28 +144,31 @@ def display_historic_pl(df_rewards, time_col='time', amount_col=None,
 # 2. HISTORIC REWARDS TRENDS
 # ═══════════════════════════════════════════════════════════════
 
-def calculate_rewards_by_month(df_rewards, time_col='time', amount_col=None):
+def calculate_rewards_by_month(df_rewards, time_col='time', amount_col=None, backend=None):
     """
     Calculate rewards trends by month.
     """
-    df = df_rewards.copy()
-    
-    # Auto-detect amount column
-    if amount_col is None:
-        for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']:
-            if col in df.columns:
-                amount_col = col
-                break
-    
-    df[time_col] = pd.to_datetime(df[time_col])
-    df['month'] = df[time_col].dt.to_period('M')
-    
-    monthly = df.groupby('month').agg({
-        amount_col: ['sum', 'count', 'mean']
-    }).reset_index()
-    
-    monthly.columns = ['Month', 'Total Rewards', 'Transactions', 'Avg Reward']
-    monthly['Month'] = monthly['Month'].astype(str)
+    if resolve_backend(backend) == 'duckdb':
+        monthly = duckdb_monthly_stats(df_rewards, time_col, amount_col)
+    else:
+        df = read_source(df_rewards).copy()
+        
+        # Auto-detect amount column
+        if amount_col is None:
+            for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']:
+                if col in df.columns:
+                    amount_col = col
+                    break
+        
+        df[time_col] = pd.to_datetime(df[time_col])
+        df['month'] = df[time_col].dt.to_period('M')
+        
+        monthly = df.groupby('month').agg({
+            amount_col: ['sum', 'count', 'mean']
+        }).reset_index()
+        
+        monthly.columns = ['Month', 'Total Rewards', 'Transactions', 'Avg Reward']
+        monthly['Month'] = monthly['Month'].astype(str)
     
     # Calculate MoM growth
     monthly['MoM Growth %'] = monthly['Total Rewards'].pct_change() * 100
@@ -133,33 +176,39 @@ def calculate_rewards_by_month(df_rewards, time_col='time', amount_col=None):
     return monthly
 
 
-def calculate_rewards_by_network(df_rewards, network_col='network', amount_col=None):
+def calculate_rewards_by_network(df_rewards, network_col='network', amount_col=None, backend=None):
     """
     Calculate rewards breakdown by network.
     """
-    df = df_rewards.copy()
-    
-    # Auto-detect columns
-    if amount_col is None:
-        for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount']:
-            if col in df.columns:
-                amount_col = col
-                break
-    
-    if network_col not in df.columns:
-        for col in ['network', 'vault', 'vault_name', 'protocol']:
-            if col in df.columns:
-                network_col = col
-                break
-    
-    if network_col not in df.columns:
-        return pd.DataFrame({'Note': ['No network column found']})
-    
-    by_network = df.groupby(network_col).agg({
-        amount_col: 'sum'
-    }).reset_index()
+    if resolve_backend(backend) == 'duckdb':
+        by_network = duckdb_network_totals(df_rewards, network_col, amount_col)
+        if by_network is None:
+            return pd.DataFrame({'Note': ['No network column found']})
+    else:
+        df = read_source(df_rewards).copy()
+        
+        # Auto-detect columns
+        if amount_col is None:
+            for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount']:
+                if col in df.columns:
+                    amount_col = col
+                    break
+        
+        if network_col not in df.columns:
+            for col in ['network', 'vault', 'vault_name', 'protocol']:
+                if col in df.columns:
+                    network_col = col
+                    break
+        
+        if network_col not in df.columns:
+            return pd.DataFrame({'Note': ['No network column found']})
+        
+        by_network = df.groupby(network_col).agg({
+            amount_col: 'sum'
+        }).reset_index()
+        
+        by_network.columns = ['Network', 'Total Rewards']
     
-    by_network.columns = ['Network', 'Total Rewards']
     by_network = by_network.sort_values('Total Rewards', ascending=False)
     by_network['% of Total'] = (by_network['Total Rewards'] / by_network['Total Rewards'].sum() * 100).round(1)
     
@@ -209,35 +258,39 @@ def display_rewards_trends(df_rewards, df_rewards_network=None, time_col='time',
 # 3. HISTORIC TVL TRENDS
 # ═══════════════════════════════════════════════════════════════
 
-def calculate_tvl_trends(df_tvl, time_col='time', tvl_col='tvl'):
+def calculate_tvl_trends(df_tvl, time_col='time', tvl_col='tvl', backend=None):
     """
     Calculate TVL trends over time.
     """
-    df = df_tvl.copy()
-    
-    # Auto-detect columns
-    if tvl_col not in df.columns:
-        for col in ['tvl', 'total_tvl', 'tvl_usd', 'value', 'amount']:
-            if col in df.columns:
-                tvl_col = col
-                break
-    
-    if time_col not in df.columns:
-        for col in ['time', 'date', 'timestamp', 'block_time']:
-            if col in df.columns:
-                time_col = col
-                break
-    
-    df[time_col] = pd.to_datetime(df[time_col])
-    df = df.sort_values(time_col)
-    
-    # Get daily/weekly snapshots
-    df['date'] = df[time_col].dt.date
-    daily = df.groupby('date').agg({
-        tvl_col: 'last'  # End of day TVL
-    }).reset_index()
-    
-    daily.columns = ['Date', 'TVL']
+    if resolve_backend(backend) == 'duckdb':
+        daily = duckdb_daily_tvl(df_tvl, time_col, tvl_col)
+    else:
+        df = read_source(df_tvl).copy()
+        
+        # Auto-detect columns
+        if tvl_col not in df.columns:
+            for col in ['tvl', 'total_tvl', 'tvl_usd', 'value', 'amount']:
+                if col in df.columns:
+                    tvl_col = col
+                    break
+        
+        if time_col not in df.columns:
+            for col in ['time', 'date', 'timestamp', 'block_time']:
+                if col in df.columns:
+                    time_col = col
+                    break
+        
+        df[time_col] = pd.to_datetime(df[time_col])
+        # Stable sort so same-timestamp rows keep file order for 'last'
+        df = df.sort_values(time_col, kind='mergesort')
+        
+        # Get daily/weekly snapshots
+        df['date'] = df[time_col].dt.date
+        daily = df.groupby('date').agg({
+            tvl_col: 'last'  # End of day TVL
+        }).reset_index()
+        
+        daily.columns = ['Date', 'TVL']
     
     # Calculate changes
     daily['Change'] = daily['TVL'].diff()
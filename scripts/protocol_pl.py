@@ -11,6 +11,9 @@ import pandas as pd
 from dataclasses import dataclass
 from typing import Optional, Dict
 
+from .compute_backend import resolve_backend, read_source, source_columns, duckdb_total
+from .fee_schedule import DatedSchedule, monthly_revenue_with_schedule, scheduled_opex
+
 # ═══════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════
@@ -38,6 +41,11 @@ class PLConfig:
     # Number of months to calculate
     months: int = 6
     
+    # Optional dated schedules (applied to daily history instead of the flat values)
+    fee_schedule: Optional[DatedSchedule] = None      # replaces default_fee_rate
+    opex_schedule: Optional[DatedSchedule] = None     # replaces monthly_opex * months
+    schedule_key_col: Optional[str] = None            # e.g. 'network_name' for per-network rates
+    
     def __post_init__(self):
         if self.vault_fees is None:
             self.vault_fees = {
@@ -58,14 +66,20 @@ DEFAULT_CONFIG = PLConfig()
 # P&L CALCULATION
 # ═══════════════════════════════════════════════════════════════
 
-def calculate_pl(df_rewards, config: PLConfig = None, amount_col: str = None):
+def calculate_pl(df_rewards, config: PLConfig = None, amount_col: str = None,
+                 backend: Optional[str] = None, time_col: Optional[str] = None):
     """
     Calculate Protocol P&L from rewards data.
     
     Args:
-        df_rewards: DataFrame with rewards data
+        df_rewards: DataFrame (or CSV/Parquet path) with rewards data
         config: PLConfig object (uses defaults if None)
         amount_col: Column name for reward amounts (auto-detected if None)
+        backend: 'pandas' or 'duckdb' (default: current backend)
+        time_col: Timestamp column, needed with schedules (auto-detected if None)
+    
+    With an opex schedule, opex covers every calendar month from the first to
+    the last month with rewards, and 'months' is that count.
     
     Returns:
         dict with P&L metrics
@@ -73,29 +87,62 @@ def calculate_pl(df_rewards, config: PLConfig = None, amount_col: str = None):
     if config is None:
         config = DEFAULT_CONFIG
     
-    # Auto-detect amount column
-    if amount_col is None:
-        for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']:
-            if col in df_rewards.columns:
-                amount_col = col
-                break
+    fee_rate = config.default_fee_rate
+    months = config.months
+    monthly = None
+    
+    if config.fee_schedule is not None or config.opex_schedule is not None:
+        # Apply dated schedules to the daily history
+        if time_col is None:
+            columns = source_columns(df_rewards)
+            time_col = next((c for c in ['time', 'dt', 'date', 'timestamp', 'block_time'] if c in columns), None)
+        if time_col is None:
+            raise ValueError("Could not find time column in data (required for fee/opex schedules)")
+        
+        fee_schedule = config.fee_schedule or DatedSchedule.flat(config.default_fee_rate)
+        monthly = monthly_revenue_with_schedule(df_rewards, fee_schedule, time_col, amount_col,
+                                                config.schedule_key_col, backend)
+        gross_rewards = monthly['Gross Rewards'].sum()
+        protocol_revenue = monthly['Protocol Revenue'].sum()
+        if config.fee_schedule is not None and gross_rewards > 0:
+            # Effective (rewards-weighted) rate over the period
+            fee_rate = protocol_revenue / gross_rewards
+    elif resolve_backend(backend) == 'duckdb':
+        # Calculate gross rewards in DuckDB
+        gross_rewards, amount_col = duckdb_total(df_rewards, amount_col)
+    else:
+        df_rewards = read_source(df_rewards)
         
+        # Auto-detect amount column
         if amount_col is None:
-            numeric_cols = df_rewards.select_dtypes(include=['float64', 'int64']).columns
-            amount_col = numeric_cols[0] if len(numeric_cols) > 0 else None
-    
-    if amount_col is None:
-        raise ValueError("Could not find amount column in data")
-    
-    # Calculate gross rewards
-    gross_rewards = df_rewards[amount_col].sum()
+            for col in ['total_rewards_usd', 'amount_usd', 'rewards_usd', 'amount', 'value']:
+                if col in df_rewards.columns:
+                    amount_col = col
+                    break
+            
+            if amount_col is None:
+                numeric_cols = df_rewards.select_dtypes(include=['float64', 'int64']).columns
+                amount_col = numeric_cols[0] if len(numeric_cols) > 0 else None
+        
+        if amount_col is None:
+            raise ValueError("Could not find amount column in data")
+        
+        # Calculate gross rewards
+        gross_rewards = df_rewards[amount_col].sum()
     
     # Calculate protocol revenue
-    protocol_revenue = gross_rewards * config.default_fee_rate
+    if monthly is None:
+        protocol_revenue = gross_rewards * config.default_fee_rate
     staker_rewards = gross_rewards - protocol_revenue
     
     # Calculate operating expenses
-    total_opex = config.monthly_opex * config.months
+    if config.opex_schedule is not None:
+        # Scheduled opex for every calendar month from the first to the last
+        # month with rewards (monthly already has a row for each)
+        total_opex = scheduled_opex(monthly['Month'], config.opex_schedule).sum()
+        months = len(monthly)
+    else:
+        total_opex = config.monthly_opex * config.months
     personnel = total_opex * config.opex_personnel
     audit = total_opex * config.opex_audit
     marketing = total_opex * config.opex_marketing
@@ -120,8 +167,8 @@ def calculate_pl(df_rewards, config: PLConfig = None, amount_col: str = None):
         'net_income': net_income,
         'gross_margin': gross_margin,
         'net_margin': net_margin,
-        'months': config.months,
-        'fee_rate': config.default_fee_rate,
+        'months': months,
+        'fee_rate': fee_rate,
     }
 
 
@@ -226,8 +273,15 @@ def display_pl(df_rewards, config: PLConfig = None, style_func=None):
     print(f"   Net Margin:       {metrics['net_margin']:.1f}%")
     
     print(f"\n⚠️  Assumptions:")
-    print(f"   • Protocol fee: {metrics['fee_rate']*100:.0f}% (currently 0% in growth phase)")
-    print(f"   • Monthly OpEx: ${config.monthly_opex if config else DEFAULT_CONFIG.monthly_opex:,.0f}")
+    cfg = config or DEFAULT_CONFIG
+    if cfg.fee_schedule is not None:
+        print(f"   • Protocol fee: {metrics['fee_rate']*100:.1f}% effective (schedule: {cfg.fee_schedule.describe()})")
+    else:
+        print(f"   • Protocol fee: {metrics['fee_rate']*100:.0f}% (currently 0% in growth phase)")
+    if cfg.opex_schedule is not None:
+        print(f"   • Monthly OpEx schedule: {cfg.opex_schedule.describe()}")
+    else:
+        print(f"   • Monthly OpEx: ${cfg.monthly_opex:,.0f}")
     
     return metrics, df_pl
 
@@ -0,0 +1,143 @@
+"""
+Parity tests: every calculation must return the same DataFrame (or metrics
+dict) on the pandas and DuckDB backends.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')
+
+from scripts.compute_backend import check_backend_parity
+from scripts.historic_data import (
+    calculate_monthly_pl,
+    calculate_rewards_by_month,
+    calculate_rewards_by_network,
+    calculate_tvl_trends,
+)
+from scripts.protocol_pl import calculate_pl
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+REWARDS_CSV = os.path.join(DATA_DIR, 'rewards_total.csv')
+REWARDS_NETWORK_CSV = os.path.join(DATA_DIR, 'rewards_by_network.csv')
+TVL_CSV = os.path.join(DATA_DIR, 'tvl_over_time.csv')
+
+
+def assert_parity(func, source, **kwargs):
+    expected = func(source, backend='pandas', **kwargs)
+    actual = func(source, backend='duckdb', **kwargs)
+    if isinstance(expected, dict):
+        expected, actual = pd.DataFrame([expected]), pd.DataFrame([actual])
+    pd.testing.assert_frame_equal(expected, actual, rtol=1e-9, check_dtype=False)
+    return expected
+
+
+def rewards_cases(rewards):
+    return [
+        (calculate_monthly_pl, rewards, {'time_col': 'dt'}),
+        (calculate_rewards_by_month, rewards, {'time_col': 'dt'}),
+        (calculate_pl, rewards, {}),
+    ]
+
+
+# ═══════════════════════════════════════════════════════════════
+# BUNDLED DATA
+# ═══════════════════════════════════════════════════════════════
+
+@pytest.fixture(params=['path', 'dataframe'])
+def as_source(request):
+    if request.param == 'path':
+        return lambda path: path
+    return pd.read_csv
+
+
+def test_rewards_calculations_bundled(as_source):
+    for func, source, kwargs in rewards_cases(as_source(REWARDS_CSV)):
+        assert_parity(func, source, **kwargs)
+
+
+def test_rewards_by_network_bundled(as_source):
+    result = assert_parity(calculate_rewards_by_network, as_source(REWARDS_NETWORK_CSV),
+                           network_col='network_name')
+    assert set(result['Network']) == {'Tanssi Network', 'Cap', 'Hyperlane'}
+
+
+def test_tvl_trends_bundled(as_source):
+    assert_parity(calculate_tvl_trends, as_source(TVL_CSV), time_col='dt', tvl_col='TVL_usd')
+
+
+def test_check_backend_parity_bundled():
+    report = check_backend_parity(REWARDS_CSV, TVL_CSV, REWARDS_NETWORK_CSV,
+                                  time_col='dt', network_col='network_name', tvl_col='TVL_usd')
+    assert len(report) == 5
+    assert report['Match'].all(), report
+
+
+# ═══════════════════════════════════════════════════════════════
+# SYNTHETIC EDGE CASES
+# ═══════════════════════════════════════════════════════════════
+
+def test_nan_amounts():
+    rewards = pd.DataFrame({
+        'dt': ['2025-01-03', '2025-01-05', '2025-02-01', '2025-02-02', '2025-03-01'],
+        'rewards_usd': [10.0, np.nan, np.nan, np.nan, 7.5],
+    })
+    for func, source, kwargs in rewards_cases(rewards):
+        assert_parity(func, source, **kwargs)
+    monthly = assert_parity(calculate_rewards_by_month, rewards, time_col='dt')
+    # All-NaN month sums to 0 with no transactions
+    assert monthly.loc[monthly['Month'] == '2025-02', 'Total Rewards'].item() == 0
+    assert monthly.loc[monthly['Month'] == '2025-02', 'Transactions'].item() == 0
+
+
+def test_blank_network_names():
+    rewards = pd.DataFrame({
+        'network_name': ['Cap', '', None, 'Cap', 'Hyperlane', np.nan],
+        'rewards_usd': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    result = assert_parity(calculate_rewards_by_network, rewards, network_col='network_name')
+    assert None not in set(result['Network'])
+
+
+def test_tvl_same_timestamp_ties():
+    # Several collaterals share each timestamp: 'last' must pick the last row in file order
+    tvl = pd.DataFrame({
+        'dt': ['2025-01-02', '2025-01-01', '2025-01-01', '2025-01-01', '2025-01-02', '2025-01-02'],
+        'TVL_usd': [5.0, 1.0, 2.0, 3.0, 6.0, np.nan],
+    })
+    daily = assert_parity(calculate_tvl_trends, tvl, time_col='dt', tvl_col='TVL_usd')
+    assert daily['TVL'].tolist() == [3.0, 6.0]
+
+
+def test_months_without_rewards():
+    rewards = pd.DataFrame({
+        'dt': ['2025-01-15', '2025-01-20', '2025-04-02', '2025-07-30'],
+        'rewards_usd': [1.0, 2.0, 3.0, 4.0],
+    })
+    for func, source, kwargs in rewards_cases(rewards):
+        assert_parity(func, source, **kwargs)
+    monthly = assert_parity(calculate_monthly_pl, rewards, time_col='dt')
+    assert monthly['Month'].tolist() == ['2025-01', '2025-04', '2025-07']
+
+
+def test_empty_input():
+    rewards = pd.DataFrame({'dt': pd.Series([], dtype='object'),
+                            'network_name': pd.Series([], dtype='object'),
+                            'rewards_usd': pd.Series([], dtype='float64')})
+    tvl = pd.DataFrame({'dt': pd.Series([], dtype='object'),
+                        'TVL_usd': pd.Series([], dtype='float64')})
+    for func, source, kwargs in rewards_cases(rewards):
+        assert_parity(func, source, **kwargs)
+    assert_parity(calculate_rewards_by_network, rewards, network_col='network_name')
+    assert_parity(calculate_tvl_trends, tvl, time_col='dt', tvl_col='TVL_usd')
+
+
+def test_check_backend_parity_reports_errors():
+    # Missing time column raises in both backends: reported, not raised
+    rewards = pd.DataFrame({'rewards_usd': [1.0, 2.0]})
+    report = check_backend_parity(rewards, time_col='missing')
+    assert len(report) == 4
+    assert not report.set_index('Calculation').loc['calculate_monthly_pl', 'Match']
@@ -0,0 +1,191 @@
+"""
+Chart series: LTTB against a reference loop, ChartSeries range normalization
+and caching, and the /api/chart route.
+"""
+
+import asyncio
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.chart_series import ChartSeries, LRUCache, downsample, lttb
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def reference_lttb(x, y, n_out):
+    """Textbook LTTB, one bucket at a time."""
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return list(range(n))
+    every = (n - 2) / (n_out - 2)
+    out, a = [0], 0
+    for i in range(n_out - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_start = end
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return out
+
+
+@pytest.fixture(scope='module')
+def data():
+    return {
+        'tvl_over_time': pd.read_csv(os.path.join(DATA_DIR, 'tvl_over_time.csv')),
+        'rewards_total': pd.read_csv(os.path.join(DATA_DIR, 'rewards_total.csv')),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# LTTB
+# ═══════════════════════════════════════════════════════════════
+
+@pytest.mark.parametrize('n, n_out', [(10, 3), (100, 7), (1000, 50), (997, 128), (365, 364)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 1e6, n))
+    y = np.cumsum(rng.normal(size=n))
+    assert lttb(x, y, n_out).tolist() == reference_lttb(x.tolist(), y.tolist(), n_out)
+
+
+def test_lttb_keeps_endpoints_and_size():
+    x = np.arange(500.0)
+    y = np.sin(x / 7)
+    idx = lttb(x, y, 40)
+    assert len(idx) == 40
+    assert idx[0] == 0 and idx[-1] == 499
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_small_targets():
+    x, y = np.arange(10.0), np.arange(10.0)
+    assert lttb(x, y, 10).tolist() == list(range(10))
+    assert lttb(x, y, 50).tolist() == list(range(10))
+    assert lttb(x, y, 2).tolist() == [0, 9]
+    assert lttb(x, y, 1).tolist() == [0]
+    assert lttb(x, y, 0).tolist() == []
+    assert lttb(x[:2], y[:2], 1).tolist() == [0, 1]
+
+
+def test_downsample_drops_nan_and_sorts():
+    df = pd.DataFrame({'Date': pd.to_datetime(['2025-01-03', '2025-01-01', '2025-01-02', '2025-01-04']),
+                       'TVL': [3.0, 1.0, np.nan, 4.0]})
+    out = downsample(df, 'Date', 'TVL', 10)
+    assert out['TVL'].tolist() == [1.0, 3.0, 4.0]
+
+
+# ═══════════════════════════════════════════════════════════════
+# CHART SERIES
+# ═══════════════════════════════════════════════════════════════
+
+def test_equivalent_starts_share_one_cache_entry(data):
+    charts = ChartSeries(data)
+    first = charts.get('tvl', 100, start='2025-06-01')
+    for start in ['2025-06-01T00:00', '2025-06-01 13:45', pd.Timestamp('2025-06-01'), '2025-06-01T00:00Z']:
+        assert charts.get('tvl', 100, start=start) is first
+    assert len(charts._cache) == 1
+    assert first['Date'].min() >= pd.Timestamp('2025-06-01')
+
+
+def test_empty_bounds_are_open(data):
+    charts = ChartSeries(data)
+    assert charts.get('tvl', 100, start='', end=' ') is charts.get('tvl', 100)
+
+
+@pytest.mark.parametrize('start', ['nat', 'not-a-date', '2025-13-45'])
+def test_bad_dates_raise_value_error(data, start):
+    with pytest.raises(ValueError):
+        ChartSeries(data).get('tvl', 100, start=start)
+
+
+def test_unknown_series_raises(data):
+    with pytest.raises(ValueError):
+        ChartSeries(data).get('nope')
+
+
+def test_tvl_by_collateral_per_collateral_limit(data):
+    out = ChartSeries(data).get('tvl_by_collateral', points=10)
+    assert out.groupby('Collateral').size().max() <= 10
+
+
+def test_lru_cache_is_bounded():
+    cache = LRUCache(2)
+    for i in range(5):
+        cache.put(i, i)
+    assert len(cache) == 2
+    assert cache.get(0) is None and cache.get(4) == 4
+    cache.get(3)
+    cache.put(5, 5)
+    # 3 was used more recently than 4
+    assert cache.get(4) is None and cache.get(3) == 3
+    disabled = LRUCache(0)
+    disabled.put('a', 1)
+    assert len(disabled) == 0
+
+
+# ═══════════════════════════════════════════════════════════════
+# /api/chart ROUTE
+# ═══════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def app_client(tmp_path):
+    pytest.importorskip('aiohttp')
+    from aiohttp.test_utils import TestClient, TestServer
+    from scripts.dashboard_server import DATASETS, create_app
+
+    for filename in DATASETS.values():
+        shutil.copy(os.path.join(DATA_DIR, filename), tmp_path / filename)
+
+    def run(check):
+        async def main():
+            app = create_app(str(tmp_path), poll_interval=3600)
+            async with TestClient(TestServer(app)) as client:
+                return await check(app, client)
+        return asyncio.run(main())
+    return run
+
+
+def test_chart_route_equivalent_starts_share_entry(app_client):
+    async def check(app, client):
+        etags = set()
+        for start in ['2025-06-01', '2025-06-01T00:00', '2025-06-01T00:00Z']:
+            resp = await client.get('/api/chart/tvl', params={'points': '50', 'start': start})
+            assert resp.status == 200
+            etags.add(resp.headers['ETag'])
+        assert len(etags) == 1
+        assert len(app['state']['charts_cache']) == 1
+    app_client(check)
+
+
+@pytest.mark.parametrize('query, status', [
+    ({'start': ''}, 200),
+    ({'start': '2025-06-01T00:00Z'}, 200),
+    ({'end': '2025-06-01T09:00+05:00'}, 200),
+    ({'start': 'nat'}, 400),
+    ({'start': 'garbage'}, 400),
+    ({'points': 'many'}, 400),
+])
+def test_chart_route_bad_input_is_400_not_500(app_client, query, status):
+    async def check(app, client):
+        resp = await client.get('/api/chart/tvl_by_collateral', params=query)
+        return resp.status
+    assert app_client(check) == status
+
+
+def test_chart_route_unknown_series_is_400(app_client):
+    async def check(app, client):
+        return (await client.get('/api/chart/nope')).status
+    assert app_client(check) == 400
@@ -0,0 +1,137 @@
+"""
+Dashboard API server: every endpoint serves, ETag / gzip negotiation, and
+recompute when a data file changes.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from scripts.dashboard_server import DATASETS, ENDPOINTS, _accepts_gzip, create_app
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for filename in DATASETS.values():
+        shutil.copy(os.path.join(DATA_DIR, filename), tmp_path / filename)
+    return str(tmp_path)
+
+
+def run_client(data_dir, check, poll_interval=3600):
+    """Run `check(client)` against a live test server."""
+    async def main():
+        app = create_app(data_dir, poll_interval=poll_interval)
+        async with TestClient(TestServer(app), auto_decompress=False) as client:
+            return await check(client)
+    return asyncio.run(main())
+
+
+async def get(client, path, **headers):
+    headers.setdefault('Accept-Encoding', 'identity')
+    resp = await client.get(path, headers=headers)
+    return resp, await resp.read()
+
+
+# ═══════════════════════════════════════════════════════════════
+# ENDPOINTS
+# ═══════════════════════════════════════════════════════════════
+
+def test_every_endpoint_returns_200(data_dir):
+    async def check(client):
+        resp, body = await get(client, '/api')
+        assert resp.status == 200
+        index = json.loads(body)
+        assert index['endpoints'] == [f'/api/{name}' for name in sorted(ENDPOINTS)]
+        for path in index['endpoints'] + index['charts']:
+            resp, body = await get(client, path)
+            assert resp.status == 200, path
+            assert json.loads(body)['version'] == index['version']
+        resp, _ = await get(client, '/api/nope')
+        assert resp.status == 404
+    run_client(data_dir, check)
+
+
+def test_tvl_trends_sums_daily_totals(data_dir):
+    tvl = pd.read_csv(os.path.join(data_dir, DATASETS['tvl']))
+    expected = tvl.groupby(pd.to_datetime(tvl['dt']).dt.normalize())['TVL_usd'].sum()
+
+    async def check(client):
+        _, body = await get(client, '/api/tvl-trends')
+        return json.loads(body)['data']
+    rows = run_client(data_dir, check)
+
+    # Summed across collaterals, not the last collateral row of each day
+    # (to_json keeps 10 decimals, hence the absolute tolerance)
+    assert [row['TVL'] for row in rows] == pytest.approx(expected.tolist(), rel=1e-8, abs=1e-6)
+
+
+# ═══════════════════════════════════════════════════════════════
+# CACHING HEADERS
+# ═══════════════════════════════════════════════════════════════
+
+def test_if_none_match_returns_304(data_dir):
+    async def check(client):
+        resp, _ = await get(client, '/api/monthly-pl')
+        etag = resp.headers['ETag']
+        resp, body = await get(client, '/api/monthly-pl', **{'If-None-Match': etag})
+        assert resp.status == 304 and body == b''
+        resp, _ = await get(client, '/api/monthly-pl', **{'If-None-Match': '"stale"'})
+        assert resp.status == 200
+    run_client(data_dir, check)
+
+
+@pytest.mark.parametrize('accept, gzipped', [
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('*', True),
+    ('identity', False),
+    ('gzip;q=0', False),
+    ('gzip; q=0.0, identity', False),
+    ('*;q=0.5, gzip;q=0', False),
+])
+def test_gzip_only_when_accepted(data_dir, accept, gzipped):
+    async def check(client):
+        resp, body = await get(client, '/api/pl', **{'Accept-Encoding': accept})
+        assert resp.status == 200
+        assert ('Content-Encoding' in resp.headers) == gzipped
+        return gzip.decompress(body) if gzipped else body
+    body = run_client(data_dir, check)
+    assert 'gross_rewards' in json.loads(body)['data']
+
+
+def test_accepts_gzip_header_parsing():
+    assert _accepts_gzip('gzip;q=0.8')
+    assert _accepts_gzip('x-gzip')
+    assert not _accepts_gzip(None)
+    assert not _accepts_gzip('')
+    assert not _accepts_gzip('GZIP;Q=0')
+
+
+def test_data_change_updates_version_and_etag(data_dir):
+    path = os.path.join(data_dir, DATASETS['rewards'])
+
+    async def check(client):
+        resp, body = await get(client, '/api/pl')
+        old_etag, old_version = resp.headers['ETag'], json.loads(body)['version']
+
+        with open(path, 'a') as f:
+            f.write(open(path).read().splitlines()[-1] + '\n')
+        for _ in range(200):
+            await asyncio.sleep(0.05)
+            resp, body = await get(client, '/api/pl')
+            if json.loads(body)['version'] != old_version:
+                break
+        assert json.loads(body)['version'] != old_version
+        assert resp.headers['ETag'] != old_etag
+    run_client(data_dir, check, poll_interval=0.05)
@@ -0,0 +1,141 @@
+"""
+Entity registry: name / address normalization, collateral unification,
+CSR join indexes and the encoded bundled datasets.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.entity_registry import (
+    MISSING,
+    EntityRegistry,
+    JoinIndex,
+    encode_datasets,
+    parse_token_list,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+DATASETS = ['tvl_over_time', 'tvl_by_collateral', 'tvl_by_vault',
+            'rewards_by_network', 'rewards_total', 'network_rewards']
+
+WSTETH = '0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0'
+
+
+@pytest.fixture(scope='module')
+def data():
+    return {name: pd.read_csv(os.path.join(DATA_DIR, f'{name}.csv')) for name in DATASETS}
+
+
+@pytest.fixture(scope='module')
+def encoded(data):
+    return encode_datasets(data)
+
+
+# ═══════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════
+
+def test_collateral_symbol_and_address_unify():
+    reg = EntityRegistry()
+    reg.add_collaterals(['wstETH'], [WSTETH])
+    # tvl_by_collateral: symbol only; tvl_by_vault: address in the collateral field
+    reg.add_collaterals(['wstETH'])
+    reg.add('collateral', [WSTETH.lower(), '0xDEAD'])
+    assert reg.size('collateral') == 2
+
+    ids = reg.encode('collateral', ['wstETH', ' wstETH ', WSTETH, WSTETH.lower(), '0xdead', 'rETH', None])
+    assert ids[:4].tolist() == [ids[0]] * 4
+    assert ids[4] != ids[0] and ids[4] >= 0
+    assert ids[5:].tolist() == [MISSING, MISSING]
+    # Address-only collateral is labelled by its (lower-cased) address
+    assert reg.decode('collateral', ids[[0, 4]]).tolist() == ['wstETH', '0xdead']
+
+
+def test_colliding_symbols_keep_separate_ids():
+    reg = EntityRegistry()
+    reg.add_collaterals(['USDC', 'USDC'], ['0xaaa', '0xbbb'])
+    ids = reg.encode('collateral', ['0xAAA', '0xbbb'])
+    assert ids[0] != ids[1]
+    # Ambiguous symbol -> labels fall back to addresses
+    assert set(reg.labels('collateral')) == {'0xaaa', '0xbbb'}
+
+
+def test_blank_network_names_are_missing():
+    reg = EntityRegistry().add('network', ['Cap', ' Cap ', '', '   ', None, np.nan, 'Hyperlane'])
+    assert list(reg.labels('network')) == ['Cap', 'Hyperlane']
+    ids = reg.encode('network', ['Cap', 'Cap  ', '', '  ', None, np.nan, 'Unknown'])
+    assert ids.tolist() == [0, 0, MISSING, MISSING, MISSING, MISSING, MISSING]
+    assert reg.decode('network', ids).tolist() == ['Cap', 'Cap', None, None, None, None, None]
+
+
+def test_parse_token_list():
+    assert parse_token_list("['HYPER']") == ['HYPER']
+    assert parse_token_list("['USDC', 'TANSSI']") == ['USDC', 'TANSSI']
+    assert parse_token_list('HYPER') == ['HYPER']
+    assert parse_token_list(np.nan) == []
+    assert parse_token_list(None) == []
+
+
+def test_registry_copy_is_independent():
+    reg = EntityRegistry().add('network', ['Cap'])
+    other = reg.copy().add('network', ['Hyperlane'])
+    assert reg.size('network') == 1 and other.size('network') == 2
+
+
+# ═══════════════════════════════════════════════════════════════
+# JOIN INDEX
+# ═══════════════════════════════════════════════════════════════
+
+def test_join_index_skips_missing_codes():
+    codes = np.array([1, MISSING, 0, 1, MISSING, 2])
+    index = JoinIndex.build(codes, 4)
+    # MISSING rows sort first; offsets start after them
+    assert index.offsets.tolist() == [2, 3, 5, 6, 6]
+    assert index.rows(0).tolist() == [2]
+    assert index.rows(1).tolist() == [0, 3]
+    assert index.rows(2).tolist() == [5]
+    assert index.rows(3).tolist() == []
+    assert index.counts().tolist() == [1, 2, 1, 0]
+
+
+# ═══════════════════════════════════════════════════════════════
+# BUNDLED DATA
+# ═══════════════════════════════════════════════════════════════
+
+def test_vaults_for_collateral_bundled(data, encoded):
+    vaults = data['tvl_by_vault']
+    expected = set(vaults.loc[vaults['collateral'] == 'wstETH', 'vault'])
+    for key in ['wstETH', WSTETH]:
+        rows = encoded.vaults_for_collateral(key)
+        assert set(encoded.registry.decode('vault', rows['vault_id'])) == expected
+    assert encoded.vaults_for_collateral('NOPE').empty
+
+
+def test_daily_rewards_for_network_bundled(data, encoded):
+    rewards = data['rewards_by_network']
+    for network in ['Cap', 'Hyperlane', 'Tanssi Network']:
+        rows = encoded.daily_rewards_for_network(network)
+        expected = rewards.loc[rewards['network_name'] == network, 'rewards_usd']
+        assert len(rows) == len(expected)
+        assert rows['rewards_usd'].sum() == pytest.approx(expected.sum())
+        nid = encoded.registry.encode('network', [network])[0]
+        assert len(encoded.daily_rewards_for_network(nid)) == len(rows)
+    assert encoded.daily_rewards_for_network('').empty
+
+
+def test_rewards_with_stake_without_network_rewards(data):
+    # fetch_csv_from_github leaves an empty frame for a failed download
+    enc = encode_datasets(dict(data, network_rewards=pd.DataFrame()))
+    assert len(enc.network_stake) == enc.registry.size('network')
+    joined = enc.rewards_with_stake()
+    assert joined['network_stake_usd'].isna().all()
+
+
+def test_rewards_with_stake_bundled(data, encoded):
+    joined = encoded.rewards_with_stake()
+    stake = data['network_rewards'].set_index('Network')['Network Stake USD']
+    cap = joined['network_id'] == encoded.registry.encode('network', ['Cap'])[0]
+    assert (joined.loc[cap, 'network_stake_usd'] == stake['Cap']).all()
@@ -0,0 +1,170 @@
+"""
+Exposure engine: sparse row metrics against dense references, edge
+splitting, name normalization and registry isolation.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('scipy')
+
+from scipy import sparse
+
+from scripts.entity_registry import build_registry
+from scripts.exposure import ExposureEngine, exposure_matrix, row_hhi, row_top_k_share
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def dense_hhi(row):
+    total = row.sum()
+    return np.nan if total == 0 else ((row / total) ** 2).sum()
+
+
+def dense_top_k_share(row, k):
+    total = row.sum()
+    return np.nan if total == 0 else np.sort(row)[::-1][:k].sum() / total
+
+
+@pytest.fixture
+def matrix():
+    rng = np.random.default_rng(3)
+    dense = rng.uniform(0, 10, (30, 12)) * (rng.uniform(size=(30, 12)) < 0.3)
+    dense[5] = 0.0           # empty row
+    dense[7, :] = 0.0
+    dense[7, 4] = 2.5        # single entry
+    return dense
+
+
+@pytest.fixture
+def vaults():
+    return pd.DataFrame({
+        'vault': ['0xA1', '0xa2', '0xa3'],
+        'collateral': ['wstETH', 'wstETH', 'LBTC'],
+        'tvl': [100.0, 50.0, 10.0],
+        'delegated_stake': [200.0, 50.0, 0.0],
+    })
+
+
+# ═══════════════════════════════════════════════════════════════
+# SPARSE HELPERS
+# ═══════════════════════════════════════════════════════════════
+
+def test_row_hhi_matches_dense(matrix):
+    expected = [dense_hhi(row) for row in matrix]
+    np.testing.assert_allclose(row_hhi(sparse.csr_matrix(matrix)), expected)
+
+
+@pytest.mark.parametrize('k', [1, 2, 3, 20])
+def test_row_top_k_share_matches_dense(matrix, k):
+    expected = [dense_top_k_share(row, k) for row in matrix]
+    np.testing.assert_allclose(row_top_k_share(sparse.csr_matrix(matrix), k), expected)
+
+
+def test_row_top_k_share_sums_duplicate_entries():
+    # Two triples for the same cell are one entry of weight 3
+    m = sparse.coo_matrix(([1.0, 2.0, 2.5], ([0, 0, 0], [1, 1, 2])), shape=(1, 3))
+    assert row_top_k_share(m, 1)[0] == pytest.approx(3.0 / 5.5)
+
+
+def test_exposure_matrix_drops_unknown_ids():
+    m = exposure_matrix([0, 1, -1, 1], [0, -1, 1, 1], [1.0, 2.0, 3.0, 4.0], (2, 2))
+    assert m.toarray().tolist() == [[1.0, 0.0], [0.0, 4.0]]
+
+
+# ═══════════════════════════════════════════════════════════════
+# EDGES
+# ═══════════════════════════════════════════════════════════════
+
+def test_blank_networks_do_not_dilute_split(vaults):
+    edges = pd.DataFrame({'vault': ['0xa1', '0xa1', '0xa1', '0xa1', '0xa2', '0xff'],
+                          'network': ['Cap', ' Hyperlane ', '', None, 'Cap', 'Cap']})
+    engine = ExposureEngine(vaults, network_edges=edges)
+    reg = engine.registry
+    dense = engine.network.toarray()
+    a1, a2 = reg.encode('vault', ['0xa1', '0xa2'])
+    cap, hyperlane = reg.encode('network', ['Cap', 'Hyperlane'])
+    assert list(reg.labels('network')) == ['Cap', 'Hyperlane']
+    # Delegated stake split over the two valid edges only
+    assert dense[a1].sum() == pytest.approx(200.0)
+    assert dense[a1, cap] == dense[a1, hyperlane] == pytest.approx(100.0)
+    assert dense[a2, cap] == pytest.approx(50.0)
+
+
+def test_stake_column_used_as_weights(vaults):
+    edges = pd.DataFrame({'vault': ['0xa1', '0xa1', '0xa2'], 'network': ['Cap', 'Hyperlane', 'Cap'],
+                          'stake': [150.0, 50.0, 50.0]})
+    engine = ExposureEngine(vaults, network_edges=edges)
+    metrics = engine.network_metrics().set_index('Network')
+    assert metrics.loc['Cap', 'Stake'] == pytest.approx(200.0)
+    assert metrics.loc['Hyperlane', 'Stake'] == pytest.approx(50.0)
+    a1 = engine.registry.encode('vault', ['0xa1'])[0]
+    vault = engine.vault_metrics().set_index('Vault').loc[engine.registry.labels('vault')[a1]]
+    assert vault['Network HHI'] == pytest.approx(0.75 ** 2 + 0.25 ** 2)
+    assert vault['Top-3 Network Share'] == 1.0
+
+
+def test_operator_names_are_normalized(vaults):
+    ops = pd.DataFrame({'vault': ['0xa1'] * 4 + ['0xa2'],
+                        'operator': [' OpA', 'OpA ', 'OpB', '', 'OpB']})
+    engine = ExposureEngine(vaults, operator_edges=ops)
+    assert list(engine.operator_labels) == ['OpA', 'OpB']
+    metrics = engine.operator_metrics().set_index('Operator')
+    # vault a1: 3 valid edges (OpA twice, OpB once) share 200
+    assert metrics.loc['OpA', 'Stake'] == pytest.approx(200.0 * 2 / 3)
+    assert metrics.loc['OpB', 'Stake'] == pytest.approx(200.0 / 3 + 50.0)
+
+
+def test_caller_registry_is_not_modified(vaults):
+    reg = build_registry({'tvl_by_vault': vaults})
+    sizes = {kind: reg.size(kind) for kind in reg.KINDS}
+    edges = pd.DataFrame({'vault': ['0xa1', '0xa2'], 'network': ['Cap', 'Symbiotic']})
+    engine = ExposureEngine(vaults, network_edges=edges, registry=reg)
+    assert {kind: reg.size(kind) for kind in reg.KINDS} == sizes
+    assert engine.registry.size('network') == sizes['network'] + 2
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'network_edges': pd.DataFrame({'vault': ['0xa1'], 'name': ['Cap']})},
+    {'network_edges': pd.DataFrame({'network': ['Cap']})},
+    {'operator_edges': pd.DataFrame({'vault': ['0xa1'], 'network': ['Cap']})},
+    {'network_edges': pd.DataFrame({'vault': ['0xa1'], 'network': ['Cap'], 'stake': ['lots']})},
+])
+def test_malformed_edges_raise_value_error(vaults, kwargs):
+    with pytest.raises(ValueError):
+        ExposureEngine(vaults, **kwargs)
+
+
+# ═══════════════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════════════
+
+def test_network_revenue_at_risk(vaults):
+    edges = pd.DataFrame({'vault': ['0xa1', '0xa1', '0xa2'], 'network': ['Cap', 'Hyperlane', 'Cap']})
+    engine = ExposureEngine(vaults, network_edges=edges, total_revenue=250.0)
+    metrics = engine.network_metrics(slash_fraction=0.5).set_index('Network')
+    # Revenue splits 200 / 50 by delegated stake; Cap holds half of a1 and all of a2
+    assert metrics.loc['Cap', 'Revenue at Risk'] == pytest.approx(0.5 * (200.0 * 0.5 + 50.0))
+    assert metrics.loc['Hyperlane', 'Revenue at Risk'] == pytest.approx(0.5 * 100.0)
+    assert metrics.loc['Cap', 'Backing Collateral'] == pytest.approx(100.0 * 0.5 + 50.0)
+    assert metrics.loc['Cap', 'Vaults'] == 2
+
+
+def test_network_metrics_require_edges(vaults):
+    with pytest.raises(ValueError):
+        ExposureEngine(vaults).network_metrics()
+
+
+def test_bundled_collateral_metrics_and_summary():
+    vaults = pd.read_csv(os.path.join(DATA_DIR, 'tvl_by_vault.csv'))
+    engine = ExposureEngine(vaults)
+    collateral = engine.collateral_metrics()
+    assert collateral['TVL Share %'].sum() == pytest.approx(100.0)
+    assert collateral['TVL'].sum() == pytest.approx(vaults['tvl'].sum())
+    expected = vaults.groupby('collateral')['tvl'].sum() / vaults['tvl'].sum()
+    summary = engine.summary()
+    assert summary['collateral_hhi'] == pytest.approx((expected ** 2).sum())
+    assert summary['leverage'] == pytest.approx(vaults['delegated_stake'].sum() / vaults['tvl'].sum())
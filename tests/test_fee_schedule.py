@@ -0,0 +1,172 @@
+"""
+Dated fee / opex schedules: as-of lookup against a brute-force reference,
+one opex rule across every P&L view, and daily_gross backend parity.
+"""
+
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.fee_schedule import (
+    DatedSchedule,
+    backfill_fee_scenarios,
+    calculate_daily_pl,
+    daily_gross,
+)
+from scripts.historic_data import calculate_monthly_pl
+from scripts.protocol_pl import PLConfig, calculate_pl
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def reference_lookup(schedule, dates, keys=None):
+    """As-of value per row by scanning the entries (last matching entry wins)."""
+    rows = list(schedule.table.itertuples(index=False))
+    out = []
+    for i, date in enumerate(pd.to_datetime(pd.Series(dates))):
+        if pd.isna(date):
+            out.append(np.nan)
+            continue
+        key = keys[i] if keys is not None else None
+        value = schedule.initial
+        for row in rows:
+            if row.key is None and row.effective_date <= date:
+                value = row.value
+        if key is not None and not pd.isna(key):
+            for row in rows:
+                if row.key == key and row.effective_date <= date:
+                    value = row.value
+        out.append(value)
+    return np.array(out, dtype=np.float64)
+
+
+@pytest.fixture
+def schedule():
+    return DatedSchedule([
+        ('2025-01-01', 0.05),
+        ('2025-06-01', 0.10),
+        ('2025-03-15', 0.20, 'Cap'),
+        ('2025-09-01', 0.25, 'Cap'),
+        ('2025-05-01', 0.00, 'Hyperlane'),
+        ('2025-05-01', 0.01, 'Hyperlane'),   # same date: later entry wins
+    ], initial=0.02)
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(7)
+    dates = pd.Timestamp('2024-11-01') + pd.to_timedelta(rng.integers(0, 500, 400), unit='D')
+    keys = rng.choice(np.array(['Cap', 'Hyperlane', 'Tanssi', None], dtype=object), 400)
+    return dates, keys
+
+
+# ═══════════════════════════════════════════════════════════════
+# LOOKUP
+# ═══════════════════════════════════════════════════════════════
+
+def test_unkeyed_lookup_matches_reference(schedule, rows):
+    dates, _ = rows
+    np.testing.assert_array_equal(schedule.lookup(dates), reference_lookup(schedule, dates))
+
+
+def test_keyed_lookup_matches_reference(schedule, rows):
+    dates, keys = rows
+    expected = reference_lookup(schedule, dates, keys)
+    np.testing.assert_array_equal(schedule.lookup(dates, keys), expected)
+    np.testing.assert_array_equal(schedule.lookup(dates, list(keys)), expected)
+    np.testing.assert_array_equal(schedule.lookup(dates, pd.Categorical(keys)), expected)
+    # Categories the schedule has never seen
+    np.testing.assert_array_equal(
+        schedule.lookup(dates, pd.Categorical(keys, categories=['Tanssi', 'Hyperlane', 'Cap', 'Other'])),
+        expected)
+
+
+def test_keyed_date_before_first_key_entry_uses_default(schedule):
+    dates = ['2024-12-31', '2025-03-14', '2025-03-15', '2025-07-01', '2025-09-01']
+    out = schedule.lookup(dates, ['Cap'] * 5)
+    assert out.tolist() == [0.02, 0.05, 0.20, 0.20, 0.25]
+    assert schedule.lookup(['2025-04-30', '2025-05-01'], ['Hyperlane'] * 2).tolist() == [0.05, 0.01]
+
+
+def test_lookup_nat_dates_are_nan_without_overflow(schedule):
+    dates = pd.to_datetime(pd.Series(['2025-04-01', None, '2025-10-01']))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        keyed = schedule.lookup(dates, ['Cap', 'Cap', 'Cap'])
+        unkeyed = schedule.lookup(dates)
+    np.testing.assert_array_equal(keyed, [0.20, np.nan, 0.25])
+    np.testing.assert_array_equal(unkeyed, [0.05, np.nan, 0.10])
+
+
+def test_flat_schedule():
+    assert DatedSchedule.flat(0.1).lookup(['2020-01-01', '2030-01-01']).tolist() == [0.1, 0.1]
+
+
+# ═══════════════════════════════════════════════════════════════
+# OPEX RULE
+# ═══════════════════════════════════════════════════════════════
+
+def test_opex_total_is_the_same_everywhere_with_gap_months():
+    # Rewards in Jan, Apr and Jul only -> opex for all of Jan..Jul
+    rewards = pd.DataFrame({
+        'dt': ['2025-01-15', '2025-01-20', '2025-04-02', '2025-07-30'],
+        'rewards_usd': [100.0, 200.0, 300.0, 400.0],
+    })
+    fees = DatedSchedule([('2025-01-01', 0.10)])
+    opex = DatedSchedule([('2025-01-01', 100.0), ('2025-04-01', 200.0)])
+    expected = 3 * 100.0 + 4 * 200.0
+
+    daily = calculate_daily_pl(rewards, fees, opex, time_col='dt')
+    assert daily['Date'].min() == pd.Timestamp('2025-01-01')
+    assert daily['Date'].max() == pd.Timestamp('2025-07-31')
+    assert daily['Operating Costs'].sum() == pytest.approx(expected)
+
+    backfill = backfill_fee_scenarios(rewards, {'flat': fees}, opex, time_col='dt')
+    assert backfill['Operating Costs'].item() == pytest.approx(expected)
+
+    monthly = calculate_monthly_pl(rewards, time_col='dt', fee_schedule=fees, opex_schedule=opex)
+    assert monthly['Month'].tolist() == ['2025-01', '2025-02', '2025-03', '2025-04',
+                                         '2025-05', '2025-06', '2025-07']
+    assert monthly['Operating Costs'].sum() == pytest.approx(expected)
+    opex_only = calculate_monthly_pl(rewards, time_col='dt', opex_schedule=opex)
+    assert opex_only['Operating Costs'].sum() == pytest.approx(expected)
+
+    pl = calculate_pl(rewards, PLConfig(opex_schedule=opex))
+    assert pl['total_opex'] == pytest.approx(expected)
+    assert pl['months'] == 7
+
+    # Revenue agrees too
+    assert daily['Protocol Revenue'].sum() == pytest.approx(100.0)
+    assert backfill['Protocol Revenue'].item() == pytest.approx(100.0)
+    assert monthly['Protocol Revenue'].sum() == pytest.approx(100.0)
+
+
+# ═══════════════════════════════════════════════════════════════
+# DAILY GROSS BACKENDS
+# ═══════════════════════════════════════════════════════════════
+
+@pytest.mark.parametrize('key_col', [None, 'network_name'])
+def test_daily_gross_backend_parity(key_col):
+    pytest.importorskip('duckdb')
+    rewards = pd.DataFrame({
+        'dt': ['2025-01-01 03:00', '2025-01-01 20:00', None,
+               '2025-01-02 00:00', '2025-01-02 08:00', '2025-01-04 12:00'],
+        'network_name': ['Cap', 'Cap', 'Cap', None, 'Hyperlane', None],
+        'rewards_usd': [1.0, 2.0, 50.0, 3.0, np.nan, 4.0],
+    })
+    expected = daily_gross(rewards, 'dt', key_col=key_col, backend='pandas')
+    actual = daily_gross(rewards, 'dt', key_col=key_col, backend='duckdb')
+    # The row without a date is dropped by both
+    assert expected['Gross Rewards'].sum() == pytest.approx(10.0)
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual, check_dtype=False)
+
+
+def test_daily_gross_backend_parity_bundled():
+    pytest.importorskip('duckdb')
+    path = os.path.join(DATA_DIR, 'rewards_by_network.csv')
+    expected = daily_gross(path, 'dt', key_col='network_name', backend='pandas')
+    actual = daily_gross(path, 'dt', key_col='network_name', backend='duckdb')
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False, rtol=1e-9)